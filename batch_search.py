@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from corpus import DATA_DIR, INDEX_FILE
+from corpus_store import CorpusStore
+from search_engine import build_result, match_items
+
+# 1回のプロセス間通信でワーカーへ渡すクエリ数。1クエリは数ミリ秒で終わるため1件ずつでは
+# 受け渡しの時間が勝つが、結果は入力順に書き出すので大きくしすぎると出力が遅れて見える
+CHUNK_SIZE = 8
+# 1クエリあたりに出力するヒット数の既定の上限（空に近いクエリで全件を書き出さないため）
+DEFAULT_LIMIT = 10
+
+# run_query が参照するコーパス（init_worker がプロセスごとに1回だけ設定する）
+_corpus = None
+
+def init_worker(data_dir=DATA_DIR, index_path=INDEX_FILE):
+    """このプロセスの _corpus を用意する
+
+    インデックスファイルがあればメモリマップで開くため、ワーカーが増えてもページは共有される。
+    読み込めなければ、空のコーパスで全クエリを0件として書き出さないよう例外にする。
+    """
+    global _corpus
+    store = CorpusStore(data_dir, index_path)
+    store.warm_up()
+    if store.current() is None:
+        raise RuntimeError(f"コーパスを読み込めません: {store.error}")
+    _corpus = store.current()
+
+def make_executor(workers, data_dir=DATA_DIR, index_path=INDEX_FILE):
+    """各ワーカーがコーパスを読み込んだ状態のプロセスプールを返す
+
+    workers=1 ではプールを作らず、このプロセスにコーパスを読み込んで None を返す
+    （ヒットを親プロセスへ送り返す分だけ遅くなるため）。run_batch はそのとき組み込みの map を使う。
+    """
+    if workers == 1:
+        init_worker(data_dir, index_path)
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(data_dir, index_path))
+
+def read_queries(f, field="query", id_field="id", errors=sys.stderr):
+    """JSONLの各行から (ID, クエリ) を取り出す（行がJSON文字列ならそれをクエリとする）
+
+    JSONとして読めない行、オブジェクトでも文字列でもない行、クエリのフィールドが
+    無いか文字列でない行、クエリが空の行は、理由を errors に書いて飛ばす。
+    """
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            print(f"{line_no}行目: JSONとして読み込めないため飛ばします", file=errors)
+            continue
+        if isinstance(record, str):
+            query_id, search_query = line_no, record
+        elif isinstance(record, dict):
+            query_id, search_query = record.get(id_field, line_no), record.get(field)
+            if search_query is None:
+                print(f"{line_no}行目: {field} が無いため飛ばします", file=errors)
+                continue
+            if not isinstance(search_query, str):
+                print(f"{line_no}行目: {field} が文字列でないため飛ばします", file=errors)
+                continue
+        else:
+            print(f"{line_no}行目: JSONオブジェクトか文字列ではないため飛ばします", file=errors)
+            continue
+        if not search_query.strip():
+            print(f"{line_no}行目: クエリが空のため飛ばします", file=errors)
+            continue
+        yield query_id, search_query
+
+def run_query(job):
+    """1件のクエリを search_items と同じ条件（全キーワードを含む・掲載順）で検索する"""
+    query_id, search_query, limit = job
+    started = time.perf_counter()
+    item_ids = match_items(_corpus, search_query)
+    matched = time.perf_counter()
+    shown = item_ids if limit is None else item_ids[:limit]
+    hits = [build_result(_corpus, item_id, search_query) for item_id in shown]
+    finished = time.perf_counter()
+    return {
+        "id": query_id,
+        "query": search_query,
+        "count": len(item_ids),
+        "match_seconds": matched - started,
+        "seconds": finished - started,
+        "worker": os.getpid(),
+        "hits": hits,
+    }
+
+def run_batch(queries, output, workers=None, limit=DEFAULT_LIMIT, data_dir=DATA_DIR, index_path=INDEX_FILE):
+    """クエリを並列に検索し、入力の順にJSONLで書き出す。書き出した件数を返す"""
+    jobs = ((query_id, search_query, limit) for query_id, search_query in queries)
+    executor = make_executor(workers, data_dir, index_path)
+    count = 0
+    try:
+        results = map(run_query, jobs) if executor is None else executor.map(run_query, jobs, chunksize=CHUNK_SIZE)
+        for result in results:
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            count += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONLのクエリを一括で検索し、結果をJSONLで出力する")
+    parser.add_argument("input", help="クエリのJSONL（- で標準入力）")
+    parser.add_argument("-o", "--output", help="結果の出力先（省略時は標準出力）")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="並列プロセス数（既定はCPU数）")
+    parser.add_argument("--field", default="query", help="クエリを取り出すフィールド名")
+    parser.add_argument("--id-field", default="id", help="IDを取り出すフィールド名（無ければ行番号）")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="1クエリあたりに出力するヒット数の上限（0で件数のみ、-1で全件）")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="年度別JSONのデータディレクトリ")
+    parser.add_argument("--index", default=INDEX_FILE, help="build_index.py で作ったインデックスファイル")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+    try:
+        count = run_batch(
+            read_queries(source, args.field, args.id_field), output,
+            args.workers, None if args.limit < 0 else args.limit, args.data_dir, args.index,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"{count}件のクエリを検索しました（{time.perf_counter() - started:.2f}秒）", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
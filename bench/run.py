@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import token_cache
+from corpus import Corpus, load_data
+from output_test import youyaku
+from search_engine import highlight_search_term, match_items, search_items
+from synthetic import generate_corpus
+
+# 件数の多い語・少ない語・複数語・該当なしを混ぜたクエリ
+QUERIES = ("東京", "都", "待機 児童", "ICT", "教育 AI", "子供 支援 充実", "存在しない語句")
+HIGHLIGHT_QUERY = "東京 支援"
+# 要約系は1項目あたりの処理なので、規模によらず同じ件数で測る
+SUMMARY_SAMPLE = 100
+
+def measure(operation, func, scale, items, repeat=1):
+    """実行時間（repeat回の最小・平均）と、別に1回走らせたときのピークメモリを測る"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+
+    # tracemalloc は処理を遅くするため、時間とは別の実行で測る
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    record = {
+        "operation": operation,
+        "scale": scale,
+        "items": items,
+        "repeat": repeat,
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_bytes": peak,
+    }
+    print(json.dumps(record, ensure_ascii=False), file=sys.stderr)
+    return record, result
+
+def fresh_token_cache(cache_root):
+    """毎回空の形態素解析キャッシュから始め、janomeの解析コストを測れるようにする"""
+    token_cache._token_caches[token_cache.TOKEN_CACHE_DIR] = token_cache.TokenCache(tempfile.mkdtemp(dir=cache_root))
+
+def bench_scale(scale, data_dir, repeat):
+    filepaths = generate_corpus(data_dir, scale)
+    corpus = Corpus.from_files(filepaths)
+    items = len(corpus)
+    results = []
+
+    def load_all():
+        return [load_data(filepath) for filepath in filepaths]
+
+    results.append(measure("load_data", load_all, scale, items, repeat)[0])
+    results.append(measure("corpus_build", lambda: Corpus.from_files(filepaths), scale, items, repeat)[0])
+    for query in QUERIES:
+        record, hits = measure("match_items", lambda: match_items(corpus, query), scale, items, repeat)
+        results.append(dict(record, query=query, hits=len(hits)))
+        record, hits = measure("search_items", lambda: search_items(corpus, query), scale, items, repeat)
+        results.append(dict(record, query=query, hits=len(hits)))
+
+    bodies = list(corpus.item_bodies)
+    results.append(measure(
+        "highlight_search_term",
+        lambda: [highlight_search_term(body, HIGHLIGHT_QUERY) for body in bodies],
+        scale, items, repeat
+    )[0])
+
+    sample = [(youyaku.preprocess_text(corpus.item(i).body), corpus.item(i).cluster.keywords)
+              for i in range(0, items, max(1, items // SUMMARY_SAMPLE))][:SUMMARY_SAMPLE]
+    with tempfile.TemporaryDirectory() as cache_root:
+        def extract_all():
+            fresh_token_cache(cache_root)
+            return [youyaku.extract_keywords(text, keywords) for text, keywords in sample]
+
+        def summarize_all():
+            fresh_token_cache(cache_root)
+            return [youyaku.summarize_content(text, keywords) for text, keywords in sample]
+
+        results.append(dict(measure("extract_keywords", extract_all, scale, items, repeat)[0], sample=len(sample)))
+        results.append(dict(measure("summarize_content", summarize_all, scale, items, repeat)[0], sample=len(sample)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="検索・要約処理のベンチマークを実行し、結果をJSONで出力する")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="合成コーパスの倍率（1で約1.1万項目）")
+    parser.add_argument("--repeat", type=int, default=3, help="時間計測の繰り返し回数")
+    parser.add_argument("-o", "--output", help="結果の出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            results.extend(bench_scale(scale, data_dir, args.repeat))
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from corpus import DATA_DIR, discover_data_files, load_data
+
+# 現行データ（output_test の10年分）のおおよその項目数。scale=1 がこの規模になる
+BASE_ITEMS = 11000
+MEETINGS_PER_YEAR = 4
+FIRST_YEAR = 2024
+
+def collect_samples(filepaths=None):
+    """実データからカテゴリ名・キーワード・見出し・文を集め、合成の材料にする"""
+    if filepaths is None:
+        filepaths = discover_data_files(os.path.join(ROOT, DATA_DIR))
+    samples = {"categories": set(), "cluster_keywords": set(), "heads": set(), "sentences": set()}
+    for filepath in filepaths:
+        try:
+            data = load_data(filepath)
+        except FileNotFoundError:
+            continue
+        for meeting in data:
+            for category in meeting["categories"]:
+                samples["categories"].add(category["category"])
+                for cluster in category["clusters"]:
+                    samples["cluster_keywords"].add(cluster["cluster_keywords"])
+                    for item in cluster["items"]:
+                        samples["heads"].add(item["head"])
+                        samples["sentences"].update(s for s in item["body"].split("。") if s)
+    if not samples["sentences"]:
+        raise FileNotFoundError("合成の材料になるデータファイルがありません")
+    return {key: sorted(values) for key, values in samples.items()}
+
+def generate_year(rng, samples, year, item_count):
+    """1年分の会議データ（meeting_id/categories/clusters/items）を合成する"""
+    meetings = []
+    per_meeting = max(1, item_count // MEETINGS_PER_YEAR)
+    for meeting_no in range(MEETINGS_PER_YEAR, 0, -1):
+        names = rng.sample(samples["categories"], min(len(samples["categories"]), 8))
+        categories = [{"category": name, "clusters": []} for name in names]
+        remaining = per_meeting
+        while remaining > 0:
+            clusters = rng.choice(categories)["clusters"]
+            items = []
+            for _ in range(min(remaining, rng.randint(3, 12))):
+                body = "。".join(rng.choices(samples["sentences"], k=rng.randint(1, 6))) + "。"
+                items.append({"head": rng.choice(samples["heads"]), "body": body})
+            clusters.append({
+                "cluster_id": len(clusters),
+                "cluster_keywords": rng.choice(samples["cluster_keywords"]),
+                "items": items,
+            })
+            remaining -= len(items)
+        meetings.append({
+            "meeting_id": f"{year}-{meeting_no}",
+            "categories": [category for category in categories if category["clusters"]],
+        })
+    return meetings
+
+def generate_corpus(output_dir, scale=1, years=10, seed=0):
+    """scale倍の規模の合成コーパスを年度別JSONとして書き出し、そのパスを返す"""
+    rng = random.Random(seed)
+    samples = collect_samples()
+    os.makedirs(output_dir, exist_ok=True)
+    filepaths = []
+    for n in range(years):
+        year = FIRST_YEAR - n
+        filepath = os.path.join(output_dir, f"{year}.json")
+        data = generate_year(rng, samples, year, BASE_ITEMS * scale // years)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
+        filepaths.append(filepath)
+    return tuple(filepaths)
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成コーパスを作成する")
+    parser.add_argument("output_dir", help="年度別JSONの出力先")
+    parser.add_argument("--scale", type=int, default=1, help="現行データ（約1.1万項目）に対する倍率")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for filepath in generate_corpus(args.output_dir, args.scale, seed=args.seed):
+        print(filepath)
+
+if __name__ == "__main__":
+    main()
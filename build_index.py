@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from corpus import DATA_DIR, INDEX_FILE, Corpus, discover_data_files, files_version, load_manifest
+from ranking import BM25Index
+from token_cache import SEARCH_TOKEN_CACHE_DIR, get_token_cache
+
+def build_index(filepaths=None, index_path=INDEX_FILE, data_dir=DATA_DIR, tokenize=True):
+    """年度別JSONからコーパスと検索インデックスを作り、メモリマップ用のファイルに書き出す
+
+    filepaths を省略するとデータディレクトリの年度別JSONをすべて使う。
+    tokenize=True のときは全項目を形態素解析してTokenCacheに保存し、
+    アプリが関連度順の検索で解析を待たずに済むようにする（アプリや要約が
+    書き出したシャードもここで1つのファイルにまとめる）。
+    """
+    if filepaths is None:
+        filepaths = discover_data_files(data_dir)
+    # 読み込み前に印を取り、構築中に更新されたファイルは古いと判定されるようにする
+    version = files_version(filepaths)
+    corpus = Corpus.from_files(filepaths, version)
+    corpus.write_index(index_path)
+    # キーワード検索の会議一覧も合わせて更新しておく
+    load_manifest(filepaths)
+    if tokenize:
+        BM25Index.from_corpus(corpus)
+        get_token_cache(SEARCH_TOKEN_CACHE_DIR).compact()
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description="議事録データの検索インデックスを作成する")
+    parser.add_argument("files", nargs="*", help="入力する年度別JSON（省略時はデータディレクトリから探す）")
+    parser.add_argument("-o", "--output", default=INDEX_FILE, help="出力するインデックスファイル")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="年度別JSONを探すデータディレクトリ")
+    parser.add_argument("--no-tokenize", action="store_true", help="形態素解析キャッシュを作らない")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    corpus = build_index(tuple(args.files) or None, args.output, args.data_dir, not args.no_tokenize)
+    for filepath in corpus.missing_files:
+        print(f"ファイルが見つかりません: {filepath}")
+    print(f"インデックス作成完了: {args.output} ({len(corpus)}件, {time.perf_counter() - started:.2f}秒)")
+
+if __name__ == "__main__":
+    main()
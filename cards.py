@@ -0,0 +1,49 @@
+# 検索結果の1件分のカード（行頭の空白や空行があるとMarkdownとして解釈されるため1行ずつ並べる）
+RESULT_CARD_TEMPLATE = "\n".join((
+    '<div class="meeting-item">',
+    '<div style="margin-bottom: 0.8rem; text-align: center; font-size: 1rem;">',
+    '<span class="tokyo-badge">会議番号</span>',
+    '<span style="font-weight: 600;">{meeting_id}</span>',
+    '<span class="tokyo-badge">開催日</span>',
+    '<span style="font-weight: 600;">{date}</span>',
+    '</div>',
+    '<div style="margin-bottom: 0.8rem; text-align: center; font-size: 1rem;">',
+    '<span class="tokyo-badge">カテゴリ</span>',
+    '<span style="font-weight: 600;">{category}</span>',
+    '<span class="tokyo-badge">キーワード</span>',
+    '<span style="font-weight: 600;">{cluster_keywords}</span>',
+    '</div>',
+    '<div class="meeting-item-head">📌 {head}</div>',
+    '<div class="meeting-item-body">{body}</div>',
+    '</div>',
+))
+
+# キーワード検索（クラスタ内の項目）のカード
+ITEM_CARD_TEMPLATE = "\n".join((
+    '<div class="meeting-item">',
+    '<div class="meeting-item-head">📌 {head}</div>',
+    '<div class="meeting-item-body">{body}</div>',
+    '</div>',
+))
+
+# 1回の st.markdown にまとめるカード数
+CARDS_PER_FRAGMENT = 50
+
+def result_card(hit):
+    """SearchEngine の検索結果1件（ハイライト済み）をカードのHTMLにする"""
+    return RESULT_CARD_TEMPLATE.format(
+        meeting_id=hit["meeting_id"],
+        date=hit["date"],
+        category=hit["category"],
+        cluster_keywords=hit["cluster_keywords"],
+        head=hit["item"]["head"],
+        body=hit["item"]["body"],
+    )
+
+def item_card(item):
+    """コーパスの項目をカードのHTMLにする"""
+    return ITEM_CARD_TEMPLATE.format(head=item.head, body=item.body)
+
+def card_fragments(cards, size=CARDS_PER_FRAGMENT):
+    """カードのHTMLを size 件ずつ連結した断片を返す"""
+    return ["\n".join(cards[start:start + size]) for start in range(0, len(cards), size)]
@@ -0,0 +1,805 @@
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+from collections import defaultdict
+
+DATA_DIR = "output_test"
+# 年度別JSONのファイル名（2015sumlized.json などの派生ファイルは含めない）
+DATA_FILE_PATTERN = "[0-9][0-9][0-9][0-9].json"
+INDEX_FILE = f"{DATA_DIR}/corpus.idx"
+# 年度別JSONごとの会議ID一覧（*.json にするとバージョン印に含まれてしまうため拡張子を変える）
+MANIFEST_FILE = f"{DATA_DIR}/meetings.manifest"
+MANIFEST_FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+def load_data(filepath):
+    with open(filepath, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+def discover_data_files(data_dir=DATA_DIR):
+    """データディレクトリの年度別JSONを新しい年度から順に返す"""
+    return tuple(sorted(glob.glob(os.path.join(data_dir, DATA_FILE_PATTERN)), reverse=True))
+
+def file_stamp(filepath):
+    """ファイルの更新時刻とサイズ（存在しなければ None）"""
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def files_version(filepaths):
+    """ファイルごとの (パス, 更新時刻, サイズ) を並べたバージョン印を作る（存在しないものは除く）"""
+    stamps = []
+    for filepath in filepaths:
+        stamp = file_stamp(filepath)
+        if stamp is not None:
+            stamps.append((filepath, *stamp))
+    return tuple(stamps)
+
+def data_version(data_dir=DATA_DIR):
+    """データディレクトリ内の年度別JSONのバージョン印（年度の新しい順）"""
+    return files_version(discover_data_files(data_dir))
+
+def load_manifest(filepaths=None, manifest_path=MANIFEST_FILE):
+    """年度別JSONごとの会議IDを {filepath: (meeting_id, ...)} で返す（欠けたファイルは含めない）
+
+    会議IDの一覧はマニフェストファイルに保存しておき、更新時刻とサイズが
+    変わった年度だけJSONを読み直す。キーワード検索の最初の画面はこれだけで描画できる。
+    filepaths を省略するとデータディレクトリの年度別JSONをすべて対象にする。
+    """
+    if filepaths is None:
+        filepaths = discover_data_files()
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            saved = json.load(file)
+        if saved.get("format") != MANIFEST_FORMAT_VERSION:
+            saved = {}
+    except (FileNotFoundError, ValueError):
+        saved = {}
+    saved_entries = saved.get("files", {})
+
+    manifest = {}
+    entries = {}
+    for filepath in filepaths:
+        stamp = file_stamp(filepath)
+        if stamp is None:
+            continue
+        entry = saved_entries.get(filepath)
+        if entry is None or (entry["mtime_ns"], entry["size"]) != stamp:
+            try:
+                meeting_ids = [meeting["meeting_id"] for meeting in load_data(filepath)]
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                # 書き込み途中などで読めない年度は前回の一覧を使い（印は古いまま残して次回読み直す）、
+                # 前回の一覧も無ければ飛ばす
+                logger.warning("年度別JSONを読み込めません（更新中の可能性があります）: %s", filepath)
+                if entry is None:
+                    continue
+            else:
+                entry = {"mtime_ns": stamp[0], "size": stamp[1], "meeting_ids": meeting_ids}
+        entries[filepath] = entry
+        manifest[filepath] = tuple(entry["meeting_ids"])
+
+    for meeting_id, filepaths in duplicate_meeting_ids(manifest).items():
+        logger.warning("会議ID %s が複数の年度別JSONにあります（%s を優先します）: %s",
+                       meeting_id, filepaths[0], ", ".join(filepaths))
+
+    # 追加・更新・削除された年度があれば保存し直す
+    if entries != saved_entries:
+        temp_path = f"{manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"format": MANIFEST_FORMAT_VERSION, "files": entries}, file, ensure_ascii=False)
+        os.replace(temp_path, manifest_path)
+    return manifest
+
+def duplicate_meeting_ids(manifest):
+    """複数の年度別JSONに現れる会議IDを {meeting_id: (filepath, ...)} で返す（マニフェストの順）"""
+    meeting_files = defaultdict(list)
+    for filepath, meeting_ids in manifest.items():
+        for meeting_id in dict.fromkeys(meeting_ids):
+            meeting_files[meeting_id].append(filepath)
+    return {meeting_id: tuple(filepaths) for meeting_id, filepaths in meeting_files.items() if len(filepaths) > 1}
+
+def normalize_text(text):
+    """検索用に正規化する（NFKCで全角英数・半角カナなどを揃え、大文字小文字を畳み込む）"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+def normalize_with_offsets(text):
+    """正規化した文字列と、正規化後の位置から元の位置への対応表を返す
+
+    対応表は正規化後の各文字の元の位置に、末尾として元の長さを加えた配列。
+    「…」→「...」のように長さの変わる文字が無く位置がそのまま対応する場合は None。
+    """
+    normalized = normalize_text(text)
+    if normalized == text:
+        return normalized, None
+
+    # 結合文字（半角の濁点など）は直前の文字とまとめて正規化する
+    segments = []
+    for position, char in enumerate(text):
+        folded = unicodedata.normalize("NFKC", char)
+        if segments and (unicodedata.combining(char) or (folded and unicodedata.combining(folded[0]))):
+            continue
+        segments.append(position)
+    segments.append(len(text))
+
+    pieces = [normalize_text(text[start:end]) for start, end in zip(segments, segments[1:])]
+    if all(len(piece) == end - start for piece, start, end in zip(pieces, segments, segments[1:])):
+        return normalized, None
+    offset_map = array("I")
+    for piece, start in zip(pieces, segments):
+        offset_map.extend([start] * len(piece))
+    offset_map.append(len(text))
+    return "".join(pieces), offset_map
+
+def normalize_column(values):
+    """列を正規化し、位置のずれる要素だけの対応表 {要素番号: 配列} とともに返す"""
+    normalized = []
+    offset_maps = {}
+    for index, value in enumerate(values):
+        text, offset_map = normalize_with_offsets(value)
+        normalized.append(text)
+        if offset_map is not None:
+            offset_maps[index] = offset_map
+    return normalized, offset_maps
+
+def original_span(offset_map, start, end):
+    """正規化後の範囲 [start, end) を元の文字列上の範囲に直す"""
+    if offset_map is None:
+        return start, end
+    # 終端は end-1 文字目の元になった文字（の並び）の終わりまで広げる
+    last = offset_map[end - 1]
+    while offset_map[end] == last:
+        end += 1
+    return offset_map[start], offset_map[end]
+
+def text_grams(text):
+    """文字unigramとbigramの集合を返す"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+def keyword_grams(keyword):
+    """キーワードを含む文書が必ず持つgramを返す（1文字ならunigram、それ以外はbigram）"""
+    if len(keyword) == 1:
+        return {keyword}
+    return {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+
+class TextColumn:
+    """文字列の列を1本の連結文字列とオフセット配列で保持する
+
+    要素ごとのstrオブジェクトを持たないためメモリが小さく、連結文字列に
+    対する str.find で全件走査をまとめて行える。
+    """
+    __slots__ = ("text", "offsets")
+
+    SEPARATOR = "\x00"
+
+    def __init__(self, values):
+        offsets = array("I", [0])
+        for value in values:
+            offsets.append(offsets[-1] + len(value) + 1)
+        self.text = self.SEPARATOR.join(values) + self.SEPARATOR if values else ""
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def contains(self, index, needle):
+        """要素を切り出さずに部分文字列の有無を調べる"""
+        return self.text.find(needle, self.offsets[index], self.offsets[index + 1] - 1) != -1
+
+class MappedTextColumn:
+    """メモリマップしたUTF-8連結文字列上の文字列の列（TextColumnと同じ操作を持つ）
+
+    オフセットはバイト単位。UTF-8は部分列の一致が文字単位の一致と等しいため、
+    contains はデコードせずにバイト列のまま探索する。
+    """
+    __slots__ = ("buffer", "base", "offsets")
+
+    def __init__(self, buffer, base, offsets):
+        self.buffer = buffer
+        self.base = base
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start = self.base + self.offsets[index]
+        end = self.base + self.offsets[index + 1] - 1
+        return self.buffer[start:end].decode("utf-8")
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def raw(self, index):
+        """デコードせずにバイト列のまま返す"""
+        return self.buffer[self.base + self.offsets[index]:self.base + self.offsets[index + 1] - 1]
+
+    def contains(self, index, needle):
+        start = self.base + self.offsets[index]
+        end = self.base + self.offsets[index + 1] - 1
+        return self.buffer.find(needle.encode("utf-8"), start, end) != -1
+
+class MappedPostings:
+    """メモリマップした語彙（昇順）とポスティングを dict.get と同じ形で引く"""
+    __slots__ = ("vocab", "offsets", "postings")
+
+    def __init__(self, vocab, offsets, postings):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings = postings
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __iter__(self):
+        return iter(self.vocab)
+
+    def __getitem__(self, gram):
+        posting = self.get(gram)
+        if posting is None:
+            raise KeyError(gram)
+        return posting
+
+    def get(self, gram, default=None):
+        # UTF-8のバイト順はコードポイント順と一致するので、バイト列のまま二分探索できる
+        key = gram.encode("utf-8")
+        low, high = 0, len(self.vocab)
+        while low < high:
+            middle = (low + high) // 2
+            if self.vocab.raw(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.vocab) and self.vocab.raw(low) == key:
+            return self.postings[self.offsets[low]:self.offsets[low + 1]]
+        return default
+
+def encode_text_column(values):
+    """文字列の列をUTF-8連結バイト列とバイトオフセット配列に変換する"""
+    offsets = array("I", [0])
+    chunks = []
+    for value in values:
+        chunk = value.encode("utf-8") + b"\0"
+        chunks.append(chunk)
+        offsets.append(offsets[-1] + len(chunk))
+    return b"".join(chunks), offsets
+
+def build_postings(heads_normalized, bodies_normalized):
+    """フリーワード検索用の文字gram転置インデックスを正規化済みの head・body から構築する"""
+    postings = defaultdict(lambda: array("I"))
+    for item_id, (head, body) in enumerate(zip(heads_normalized, bodies_normalized)):
+        for gram in text_grams(head) | text_grams(body):
+            postings[gram].append(item_id)
+    return dict(postings)
+
+class MeetingView:
+    """会議1件への参照（データ本体はCorpusの列が持つ）"""
+    __slots__ = ("corpus", "id")
+
+    def __init__(self, corpus, meeting_id):
+        self.corpus = corpus
+        self.id = meeting_id
+
+    @property
+    def meeting_id(self):
+        return self.corpus.meeting_ids[self.id]
+
+    @property
+    def date(self):
+        return self.corpus.meeting_dates[self.id]
+
+    @property
+    def source_file(self):
+        """読み込み元の年度別JSONのパス（分からなければ None）"""
+        file_no = self.corpus.meeting_files[self.id]
+        source_files = self.corpus.source_files
+        return source_files[file_no] if file_no < len(source_files) else None
+
+    @property
+    def categories(self):
+        offsets = self.corpus.meeting_categories
+        return tuple(CategoryView(self.corpus, i) for i in range(offsets[self.id], offsets[self.id + 1]))
+
+    def find_category(self, name):
+        """カテゴリ名からカテゴリを引く（無ければ None）"""
+        category_id = self.corpus.category_lookup.get((self.id, name))
+        return None if category_id is None else CategoryView(self.corpus, category_id)
+
+class CategoryView:
+    """カテゴリ1件への参照"""
+    __slots__ = ("corpus", "id")
+
+    def __init__(self, corpus, category_id):
+        self.corpus = corpus
+        self.id = category_id
+
+    @property
+    def meeting(self):
+        return MeetingView(self.corpus, self.corpus.category_meeting[self.id])
+
+    @property
+    def name(self):
+        return self.corpus.strings[self.corpus.category_names[self.id]]
+
+    @property
+    def clusters(self):
+        offsets = self.corpus.category_clusters
+        return tuple(ClusterView(self.corpus, i) for i in range(offsets[self.id], offsets[self.id + 1]))
+
+    def find_cluster(self, keywords):
+        """クラスタキーワードからクラスタを引く（無ければ None）"""
+        cluster_id = self.corpus.cluster_lookup.get((self.id, keywords))
+        return None if cluster_id is None else ClusterView(self.corpus, cluster_id)
+
+class ClusterView:
+    """クラスタ1件への参照"""
+    __slots__ = ("corpus", "id")
+
+    def __init__(self, corpus, cluster_id):
+        self.corpus = corpus
+        self.id = cluster_id
+
+    @property
+    def category(self):
+        return CategoryView(self.corpus, self.corpus.cluster_category[self.id])
+
+    @property
+    def keywords(self):
+        return self.corpus.strings[self.corpus.cluster_keywords[self.id]]
+
+    @property
+    def items(self):
+        offsets = self.corpus.cluster_items
+        return tuple(ItemView(self.corpus, i) for i in range(offsets[self.id], offsets[self.id + 1]))
+
+class ItemView:
+    """議事項目1件への参照"""
+    __slots__ = ("corpus", "id")
+
+    def __init__(self, corpus, item_id):
+        self.corpus = corpus
+        self.id = item_id
+
+    @property
+    def meeting(self):
+        return MeetingView(self.corpus, self.corpus.item_meeting[self.id])
+
+    @property
+    def category(self):
+        return CategoryView(self.corpus, self.corpus.item_category[self.id])
+
+    @property
+    def cluster(self):
+        return ClusterView(self.corpus, self.corpus.item_cluster[self.id])
+
+    @property
+    def head(self):
+        return self.corpus.item_heads[self.id]
+
+    @property
+    def body(self):
+        return self.corpus.item_bodies[self.id]
+
+INDEX_MAGIC = b"TKYMIDX1"
+INDEX_FORMAT_VERSION = 3
+
+# インデックスファイルの区画（この順に並ぶ）。meta はJSON（まれにしか無い正規化の
+# 位置対応表もここに入れる）、*_text はUTF-8、それ以外はリトルエンディアンのuint32配列。
+INDEX_SECTIONS = (
+    "meta",
+    "meeting_files", "meeting_categories", "category_meeting", "category_names", "category_clusters",
+    "cluster_category", "cluster_keywords", "cluster_items",
+    "item_meeting", "item_category", "item_cluster",
+    "heads_text", "heads_offsets",
+    "bodies_text", "bodies_offsets",
+    "heads_normalized_text", "heads_normalized_offsets",
+    "bodies_normalized_text", "bodies_normalized_offsets",
+    "vocab_text", "vocab_offsets",
+    "postings_offsets", "postings",
+)
+INDEX_HEADER = struct.Struct(f"<8sI{len(INDEX_SECTIONS) * 2}Q")
+# 整数ID（親子関係と子の範囲）の列
+ID_COLUMNS = tuple(
+    name for name in INDEX_SECTIONS
+    if not name.endswith(("_text", "_offsets")) and name not in ("meta", "postings")
+)
+
+class Corpus:
+    """全セッションで共有する読み取り専用の議事録コーパス（列指向）
+
+    会議・カテゴリ・クラスタ・項目をそれぞれ並列配列で持ち、親子関係は
+    整数IDで表す。子の範囲は offsets[i]〜offsets[i+1] で引く。
+    カテゴリ名とクラスタキーワードは strings にinternして共有する。
+    見出しと本文は normalize_text で正規化した列も持ち、照合と転置インデックスは
+    そちらで行う。正規化で位置のずれる項目だけ、元の位置への対応表を持つ。
+    列はJSONから組み立てる（from_files）か、build_index.py が書き出した
+    インデックスファイルをメモリマップして参照する（from_index）。
+    会議ID→会議、会議＋カテゴリ名→カテゴリ、カテゴリ＋キーワード→クラスタの
+    辞書索引は構築時に作る（同じキーが重複する場合は先頭を採る）。
+    """
+    __slots__ = (
+        "strings",
+        "meeting_ids", "meeting_dates", "meeting_files", "meeting_categories",
+        "category_meeting", "category_names", "category_clusters",
+        "cluster_category", "cluster_keywords", "cluster_items",
+        "item_meeting", "item_category", "item_cluster",
+        "item_heads", "item_bodies", "item_heads_normalized", "item_bodies_normalized",
+        "item_head_offset_maps", "item_body_offset_maps",
+        "postings", "missing_files", "source_files", "version",
+        "meeting_lookup", "category_lookup", "cluster_lookup",
+    )
+    LOOKUPS = ("meeting_lookup", "category_lookup", "cluster_lookup")
+
+    def __init__(self, **columns):
+        for name in self.__slots__:
+            if name not in self.LOOKUPS:
+                super().__setattr__(name, columns[name])
+
+        # 逆順に入れて、重複キーは先頭のIDが残るようにする
+        strings = self.strings
+        meeting_lookup = {}
+        for meeting_no in range(len(self.meeting_ids) - 1, -1, -1):
+            meeting_lookup[self.meeting_ids[meeting_no]] = meeting_no
+        category_lookup = {}
+        for category_no in range(len(self.category_meeting) - 1, -1, -1):
+            key = (self.category_meeting[category_no], strings[self.category_names[category_no]])
+            category_lookup[key] = category_no
+        cluster_lookup = {}
+        for cluster_no in range(len(self.cluster_category) - 1, -1, -1):
+            key = (self.cluster_category[cluster_no], strings[self.cluster_keywords[cluster_no]])
+            cluster_lookup[key] = cluster_no
+        super().__setattr__("meeting_lookup", meeting_lookup)
+        super().__setattr__("category_lookup", category_lookup)
+        super().__setattr__("cluster_lookup", cluster_lookup)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Corpus は読み取り専用です")
+
+    @classmethod
+    def from_data(cls, data, missing_files=(), source_files=(), version=None, searchable=True, meeting_files=None):
+        """json.load した会議データのリストから列を組み立てる
+
+        meeting_files には会議ごとに読み込み元（source_files の番号）を渡す（省略時は
+        すべて0番）。searchable=False のときはフリーワード検索用の正規化列と
+        転置インデックスを作らない（キーワード検索の絞り込みだけに使う場合）。
+        """
+        string_ids = {}
+        # 会議の無いデータ（空の年度）でもすべての列を持たせる
+        columns = {name: array("I") for name in ID_COLUMNS}
+        meeting_ids, meeting_dates = [], []
+        heads, bodies = [], []
+
+        def intern_id(text):
+            text = sys.intern(text)
+            if text not in string_ids:
+                string_ids[text] = len(string_ids)
+            return string_ids[text]
+
+        for meeting in data:
+            meeting_no = len(meeting_ids)
+            meeting_ids.append(meeting["meeting_id"])
+            meeting_dates.append(meeting.get("date"))
+            columns["meeting_files"].append(meeting_files[meeting_no] if meeting_files is not None else 0)
+            columns["meeting_categories"].append(len(columns["category_meeting"]))
+            for category in meeting["categories"]:
+                category_no = len(columns["category_meeting"])
+                columns["category_meeting"].append(meeting_no)
+                columns["category_names"].append(intern_id(category["category"]))
+                columns["category_clusters"].append(len(columns["cluster_category"]))
+                for cluster in category["clusters"]:
+                    cluster_no = len(columns["cluster_category"])
+                    columns["cluster_category"].append(category_no)
+                    columns["cluster_keywords"].append(intern_id(cluster["cluster_keywords"]))
+                    columns["cluster_items"].append(len(heads))
+                    for item in cluster["items"]:
+                        columns["item_meeting"].append(meeting_no)
+                        columns["item_category"].append(category_no)
+                        columns["item_cluster"].append(cluster_no)
+                        heads.append(item["head"])
+                        bodies.append(item["body"])
+
+        # 末尾に番兵を置き、最後の要素の子範囲も offsets[i+1] で引けるようにする
+        columns["meeting_categories"].append(len(columns["category_meeting"]))
+        columns["category_clusters"].append(len(columns["cluster_category"]))
+        columns["cluster_items"].append(len(heads))
+
+        if searchable:
+            heads_normalized, head_offset_maps = normalize_column(heads)
+            bodies_normalized, body_offset_maps = normalize_column(bodies)
+        return cls(
+            strings=tuple(string_ids),
+            meeting_ids=tuple(meeting_ids),
+            meeting_dates=tuple(meeting_dates),
+            item_heads=TextColumn(heads),
+            item_bodies=TextColumn(bodies),
+            item_heads_normalized=TextColumn(heads_normalized) if searchable else None,
+            item_bodies_normalized=TextColumn(bodies_normalized) if searchable else None,
+            item_head_offset_maps=head_offset_maps if searchable else None,
+            item_body_offset_maps=body_offset_maps if searchable else None,
+            postings=build_postings(heads_normalized, bodies_normalized) if searchable else None,
+            missing_files=tuple(missing_files),
+            source_files=tuple(source_files),
+            version=version,
+            **columns,
+        )
+
+    @classmethod
+    def from_files(cls, filepaths, version=None, searchable=True):
+        """年度別JSONを順に読み込んでコーパスを構築する（欠けたファイルは記録して飛ばす）"""
+        data = []
+        missing_files = []
+        meeting_files = []
+        for file_no, filepath in enumerate(filepaths):
+            try:
+                meetings = load_data(filepath)
+            except FileNotFoundError:
+                missing_files.append(filepath)
+                continue
+            data.extend(meetings)
+            meeting_files.extend([file_no] * len(meetings))
+        return cls.from_data(data, missing_files, filepaths, version, searchable, meeting_files)
+
+    @classmethod
+    def merge(cls, parts, version=None):
+        """複数のコーパス（年度ごとなど）を順に連結して1つのコーパスにする
+
+        JSONを読み直さず、各部分の列と転置インデックスのIDをずらして繋ぐ。
+        変更のあった年度だけを作り直して全体を差し替えるときに使う。
+        """
+        string_ids = {}
+        columns = {name: array("I") for name in ID_COLUMNS}
+        postings = defaultdict(lambda: array("I"))
+        meeting_ids, meeting_dates = [], []
+        heads, bodies, heads_normalized, bodies_normalized = [], [], [], []
+        head_offset_maps, body_offset_maps = {}, {}
+        missing_files, source_files = [], []
+        searchable = all(part.postings is not None for part in parts)
+
+        def shifted(column, base):
+            return map(base.__add__, column) if base else column
+
+        for part in parts:
+            meeting_base = len(meeting_ids)
+            category_base = len(columns["category_meeting"])
+            cluster_base = len(columns["cluster_category"])
+            item_base = len(heads)
+            file_base = len(source_files)
+            string_map = []
+            for text in part.strings:
+                string_ids.setdefault(text, len(string_ids))
+                string_map.append(string_ids[text])
+
+            meeting_ids.extend(part.meeting_ids)
+            meeting_dates.extend(part.meeting_dates)
+            columns["meeting_files"].extend(shifted(part.meeting_files, file_base))
+            # 番兵（末尾のオフセット）は最後にまとめて付け直す
+            columns["meeting_categories"].extend(shifted(part.meeting_categories[:-1], category_base))
+            columns["category_meeting"].extend(shifted(part.category_meeting, meeting_base))
+            columns["category_names"].extend(string_map[i] for i in part.category_names)
+            columns["category_clusters"].extend(shifted(part.category_clusters[:-1], cluster_base))
+            columns["cluster_category"].extend(shifted(part.cluster_category, category_base))
+            columns["cluster_keywords"].extend(string_map[i] for i in part.cluster_keywords)
+            columns["cluster_items"].extend(shifted(part.cluster_items[:-1], item_base))
+            columns["item_meeting"].extend(shifted(part.item_meeting, meeting_base))
+            columns["item_category"].extend(shifted(part.item_category, category_base))
+            columns["item_cluster"].extend(shifted(part.item_cluster, cluster_base))
+            heads.extend(part.item_heads)
+            bodies.extend(part.item_bodies)
+            if searchable:
+                heads_normalized.extend(part.item_heads_normalized)
+                bodies_normalized.extend(part.item_bodies_normalized)
+                for item_id, offset_map in part.item_head_offset_maps.items():
+                    head_offset_maps[item_base + item_id] = offset_map
+                for item_id, offset_map in part.item_body_offset_maps.items():
+                    body_offset_maps[item_base + item_id] = offset_map
+                for gram in part.postings:
+                    postings[gram].extend(shifted(part.postings[gram], item_base))
+            missing_files.extend(part.missing_files)
+            source_files.extend(part.source_files)
+
+        columns["meeting_categories"].append(len(columns["category_meeting"]))
+        columns["category_clusters"].append(len(columns["cluster_category"]))
+        columns["cluster_items"].append(len(heads))
+
+        return cls(
+            strings=tuple(string_ids),
+            meeting_ids=tuple(meeting_ids),
+            meeting_dates=tuple(meeting_dates),
+            item_heads=TextColumn(heads),
+            item_bodies=TextColumn(bodies),
+            item_heads_normalized=TextColumn(heads_normalized) if searchable else None,
+            item_bodies_normalized=TextColumn(bodies_normalized) if searchable else None,
+            item_head_offset_maps=head_offset_maps if searchable else None,
+            item_body_offset_maps=body_offset_maps if searchable else None,
+            postings=dict(postings) if searchable else None,
+            missing_files=tuple(missing_files),
+            source_files=tuple(source_files),
+            version=version,
+            **columns,
+        )
+
+    @classmethod
+    def from_index(cls, index_path):
+        """build_index.py が書き出したインデックスファイルをメモリマップして開く
+
+        形式が違う・途中で切れている・壊れているファイルは ValueError にする
+        （呼び出し側はJSONからの構築に切り替える）。
+        """
+        with open(index_path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if sys.byteorder != "little":
+            raise ValueError("インデックスファイルはリトルエンディアン環境でのみ利用できます")
+        if len(buffer) < INDEX_HEADER.size:
+            raise ValueError(f"インデックスファイルが途中で切れています: {index_path}")
+        magic, format_version, *bounds = INDEX_HEADER.unpack_from(buffer)
+        if magic != INDEX_MAGIC or format_version != INDEX_FORMAT_VERSION:
+            raise ValueError(f"インデックスファイルの形式が不正です: {index_path}")
+        sections = {
+            name: (bounds[2 * i], bounds[2 * i + 1])
+            for i, name in enumerate(INDEX_SECTIONS)
+        }
+        for name, (start, end) in sections.items():
+            is_text = name == "meta" or name.endswith("_text")
+            if not INDEX_HEADER.size <= start <= end <= len(buffer) or (not is_text and (end - start) % 4):
+                raise ValueError(f"インデックスファイルが途中で切れているか壊れています: {index_path}")
+        try:
+            return cls.from_sections(buffer, sections)
+        except (KeyError, TypeError, struct.error) as error:
+            raise ValueError(f"インデックスファイルが壊れています: {index_path}") from error
+
+    @classmethod
+    def from_sections(cls, buffer, sections):
+        """from_index の本体（区画の範囲は確かめてあること）"""
+        view = memoryview(buffer)
+
+        def uint32_section(name):
+            start, end = sections[name]
+            return view[start:end].cast("I")
+
+        def text_section(name):
+            start, end = sections[f"{name}_text"]
+            return MappedTextColumn(buffer, start, uint32_section(f"{name}_offsets"))
+
+        start, end = sections["meta"]
+        meta = json.loads(bytes(view[start:end]).decode("utf-8"))
+        columns = {name: uint32_section(name) for name in ID_COLUMNS}
+        return cls(
+            strings=tuple(sys.intern(text) for text in meta["strings"]),
+            meeting_ids=tuple(meta["meeting_ids"]),
+            meeting_dates=tuple(meta["meeting_dates"]),
+            item_heads=text_section("heads"),
+            item_bodies=text_section("bodies"),
+            item_heads_normalized=text_section("heads_normalized"),
+            item_bodies_normalized=text_section("bodies_normalized"),
+            item_head_offset_maps={
+                int(item_id): array("I", offset_map)
+                for item_id, offset_map in meta["head_offset_maps"].items()
+            },
+            item_body_offset_maps={
+                int(item_id): array("I", offset_map)
+                for item_id, offset_map in meta["body_offset_maps"].items()
+            },
+            postings=MappedPostings(
+                text_section("vocab"),
+                uint32_section("postings_offsets"),
+                uint32_section("postings"),
+            ),
+            missing_files=tuple(meta["missing_files"]),
+            source_files=tuple(meta["source_files"]),
+            version=tuple(tuple(entry) for entry in meta["version"]) if meta["version"] is not None else None,
+            **columns,
+        )
+
+    def write_index(self, index_path):
+        """列をインデックスファイルに書き出す（from_index で読み戻せる固定レイアウト）"""
+        meta = {
+            "strings": list(self.strings),
+            "meeting_ids": list(self.meeting_ids),
+            "meeting_dates": list(self.meeting_dates),
+            "missing_files": list(self.missing_files),
+            "source_files": list(self.source_files),
+            "version": self.version,
+            "head_offset_maps": {item_id: list(offset_map) for item_id, offset_map in self.item_head_offset_maps.items()},
+            "body_offset_maps": {item_id: list(offset_map) for item_id, offset_map in self.item_body_offset_maps.items()},
+        }
+        vocab = sorted(self.postings)
+        postings_offsets = array("I", [0])
+        postings = array("I")
+        for gram in vocab:
+            postings.extend(self.postings[gram])
+            postings_offsets.append(len(postings))
+
+        payloads = {"meta": json.dumps(meta, ensure_ascii=False).encode("utf-8")}
+        for name, column in (("heads", self.item_heads), ("bodies", self.item_bodies),
+                             ("heads_normalized", self.item_heads_normalized),
+                             ("bodies_normalized", self.item_bodies_normalized), ("vocab", vocab)):
+            payloads[f"{name}_text"], payloads[f"{name}_offsets"] = encode_text_column(column)
+        payloads["postings_offsets"] = postings_offsets
+        payloads["postings"] = postings
+        for name in INDEX_SECTIONS:
+            if name not in payloads:
+                payloads[name] = array("I", getattr(self, name))
+
+        # 各区画を8バイト境界に揃えて並べる
+        bounds = []
+        position = INDEX_HEADER.size
+        chunks = []
+        for name in INDEX_SECTIONS:
+            payload = payloads[name]
+            if isinstance(payload, array):
+                if sys.byteorder != "little":
+                    payload = array("I", payload)
+                    payload.byteswap()
+                payload = payload.tobytes()
+            padding = -position % 8
+            chunks.append(b"\0" * padding + payload)
+            position += padding
+            bounds += [position, position + len(payload)]
+            position += len(payload)
+
+        # 書き込み途中のファイルを読まれないよう、一時ファイルから置き換える
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, *bounds))
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(temp_path, index_path)
+
+    def __len__(self):
+        return len(self.item_heads)
+
+    def item(self, item_id):
+        return ItemView(self, item_id)
+
+    def duplicate_meetings(self):
+        """複数の会議に使われている会議ID（find_meeting では先頭の会議だけが引ける）"""
+        if len(self.meeting_lookup) == len(self.meeting_ids):
+            return ()
+        seen = set()
+        return tuple(dict.fromkeys(
+            meeting_id for meeting_id in self.meeting_ids if meeting_id in seen or seen.add(meeting_id)
+        ))
+
+    def find_meeting(self, meeting_id):
+        """会議IDから会議を引く（無ければ None）"""
+        meeting_no = self.meeting_lookup.get(meeting_id)
+        return None if meeting_no is None else MeetingView(self, meeting_no)
+
+    def find_candidates(self, keywords):
+        """ポスティングリストの積集合から候補項目IDを昇順で返す"""
+        grams = set()
+        for keyword in keywords:
+            grams |= keyword_grams(keyword)
+
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not lists:
+            return range(len(self))
+
+        # 短いリストから順に絞り込む
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return sorted(candidates)
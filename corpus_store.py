@@ -0,0 +1,181 @@
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from corpus import DATA_DIR, INDEX_FILE, Corpus, data_version
+from facets import FacetIndex
+from positions import PositionalIndex
+from ranking import BM25Index
+
+# データファイルの変更を確認する間隔（秒）
+WATCH_INTERVAL = 5.0
+
+logger = logging.getLogger(__name__)
+
+# アプリ（stream2.py）とHTTPサービス（search_server.py）の検索で使う派生物
+# （search_engine は ranking から読み込まれるため、ここで組み合わせる）
+SEARCH_BUILDERS = {
+    "facets": FacetIndex.from_corpus,
+    "positions": PositionalIndex.from_corpus,
+    "ranker": BM25Index.from_corpus,
+}
+
+# 同じバージョンのコーパスと、そこから作った派生物（{名前: 値}）の組
+Snapshot = namedtuple("Snapshot", ["corpus", "derived"])
+
+class CorpusStore:
+    """年度別JSONを監視し、変更のあった年度だけ作り直したコーパスに差し替える
+
+    コーパスは年度ごと（起動時はインデックスファイル全体で1つ）の部分から
+    Corpus.merge で組み立てる。更新時刻とサイズが変わらない部分は使い回すので、
+    年度の追加や差し替えで他の年度のJSONを読み直すことはない（ただしインデックス
+    ファイル由来の部分に含まれる年度が変わったときは、その部分を年度ごとに読み直す）。
+    builders には検索用の派生物（ファセット・関連度の語統計など）を作る関数を
+    {名前: 関数(corpus)} で渡す。利用側は snapshot() で取り出したコーパスと
+    派生物の組を1回の処理の間使い続ける。差し替えは参照の置き換え1回で行うため、
+    構築途中のものや別バージョンの組み合わせは見えない。
+
+    start() で別スレッドのウォームアップ（読み込みと派生物の構築）と監視を始める。
+    起動直後はコーパス、各派生物の順にでき次第公開し、利用側は status() で
+    準備状況を確かめて待たずに描画できる。再読み込み時はすべて揃ってから差し替える。
+    """
+
+    def __init__(self, data_dir=DATA_DIR, index_path=INDEX_FILE, interval=WATCH_INTERVAL, builders=None):
+        self.data_dir = data_dir
+        self.index_path = index_path
+        self.interval = interval
+        self.builders = dict(builders or {})
+        # 部分のバージョン印（(パス, 更新時刻, サイズ) の組）→ コーパス
+        self.segments = {}
+        self.current_snapshot = None
+        self.reloads = 0
+        self.reloaded_at = None
+        self.warmup_seconds = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def load_index(self):
+        """build_index.py のインデックスファイルがあれば、その範囲の年度の部分として使う"""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            corpus = Corpus.from_index(self.index_path)
+        except ValueError:
+            return
+        if corpus.version and tuple(path for path, _, _ in corpus.version) == corpus.source_files:
+            self.segments[corpus.version] = corpus
+
+    def snapshot(self):
+        """現在のコーパスと派生物の組（ウォームアップ前は None）"""
+        return self.current_snapshot
+
+    def current(self):
+        snapshot = self.current_snapshot
+        return snapshot.corpus if snapshot is not None else None
+
+    def status(self):
+        """準備状況を {"corpus": bool, 派生物の名前: bool, ...} で返す"""
+        snapshot = self.current_snapshot
+        ready = {"corpus": snapshot is not None}
+        for name in self.builders:
+            ready[name] = snapshot is not None and name in snapshot.derived
+        return ready
+
+    def refresh(self):
+        """データファイルが変わっていればコーパスと派生物を作り直して差し替える（差し替えたら True）"""
+        with self.lock:
+            version = data_version(self.data_dir)
+            current = self.current_snapshot
+            if current is not None and current.corpus.version == version:
+                return False
+            corpus = self.build(version)
+            duplicates = corpus.duplicate_meetings()
+            if duplicates:
+                logger.warning("会議IDが重複しています（会議IDで引けるのは先の年度の会議だけです）: %s",
+                               ", ".join(duplicates))
+            derived = {}
+            if current is None:
+                # 起動直後は揃ったものから公開し、先に検索を受け付ける
+                self.current_snapshot = Snapshot(corpus, {})
+            for name, builder in self.builders.items():
+                derived[name] = builder(corpus)
+                if current is None:
+                    self.current_snapshot = Snapshot(corpus, dict(derived))
+            self.current_snapshot = Snapshot(corpus, derived)
+            self.reloads += 1
+            self.reloaded_at = time.time()
+            return True
+
+    def build(self, version):
+        """バージョン印の順に部分を並べ、変わっていない部分は使い回して連結する"""
+        segments = {}
+        parts = []
+        position = 0
+        while position < len(version):
+            for stamps, segment in self.segments.items():
+                if version[position:position + len(stamps)] == stamps:
+                    break
+            else:
+                stamps = version[position:position + 1]
+                segment = Corpus.from_files((stamps[0][0],), stamps)
+            segments[stamps] = segment
+            parts.append(segment)
+            position += len(stamps)
+        self.segments = segments
+
+        if len(parts) == 1 and parts[0].version == version:
+            return parts[0]
+        return Corpus.merge(parts, version)
+
+    def start(self):
+        """ウォームアップと監視を行うスレッドを開始する"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="corpus-watcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        self.warm_up()
+        self.watch()
+
+    def warm_up(self):
+        started = time.perf_counter()
+        try:
+            self.load_index()
+            self.refresh()
+        except Exception as error:
+            # 失敗しても監視の中で読み直しを続ける
+            self.error = repr(error)
+            logger.exception("コーパスのウォームアップに失敗しました")
+        self.warmup_seconds = time.perf_counter() - started
+
+    def watch(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                if self.refresh():
+                    self.error = None
+                    logger.info("コーパスを再読み込みしました: %d件", len(self.current()))
+            except Exception as error:
+                self.error = repr(error)
+                # 書き込み途中のファイルなどは次の確認で読み直す
+                logger.exception("コーパスの再読み込みに失敗しました")
+
+    def stats(self):
+        corpus = self.current()
+        return {
+            "files": len(corpus.source_files) if corpus is not None else 0,
+            "items": len(corpus) if corpus is not None else 0,
+            "duplicate_meetings": ", ".join(corpus.duplicate_meetings()) if corpus is not None else "",
+            "segments": len(self.segments),
+            "reloads": self.reloads,
+            "reloaded_at": self.reloaded_at,
+            "warmup_seconds": self.warmup_seconds,
+            "ready": ", ".join(name for name, ready in self.status().items() if ready),
+            "error": self.error,
+        }
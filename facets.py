@@ -0,0 +1,115 @@
+import os
+from collections import defaultdict
+
+from corpus import MeetingView
+
+# ファセット（年度・会議・カテゴリ・クラスタキーワード）
+FACETS = ("year", "meeting", "category", "cluster_keywords")
+
+def range_bitset(start, end):
+    """項目ID start〜end-1 のビットを立てたビットセット"""
+    return ((1 << (end - start)) - 1) << start
+
+def to_bitset(item_ids):
+    """項目IDの列をビットセット（Pythonのint）にする"""
+    if not item_ids:
+        return 0
+    data = bytearray((max(item_ids) >> 3) + 1)
+    for item_id in item_ids:
+        data[item_id >> 3] |= 1 << (item_id & 7)
+    return int.from_bytes(data, "little")
+
+def bitset_ids(bitset):
+    """ビットセットの立っているビットを項目IDの昇順で返す"""
+    item_ids = []
+    data = bitset.to_bytes((bitset.bit_length() + 7) >> 3, "little")
+    for byte_no, byte in enumerate(data):
+        if byte:
+            base = byte_no << 3
+            item_ids.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return item_ids
+
+def meeting_year(meeting):
+    """会議の年度（読み込み元の年度別JSONのファイル名から。分からなければ会議ID（例: 2015-1）の先頭）
+
+    2014.json の会議ID 2015-1 のように、会議IDの年度が読み込み元と違うことがある。
+    """
+    source_file = meeting.source_file
+    if source_file is not None:
+        return os.path.splitext(os.path.basename(source_file))[0]
+    return meeting.meeting_id.partition("-")[0]
+
+class FacetIndex:
+    """ファセット値ごとの項目ビットセット
+
+    会議・カテゴリ・クラスタの項目は連続したID範囲なので、各値のビットセットは
+    範囲のビット列の論理和で作れる。検索結果もビットセットにし、絞り込みと
+    件数はビット演算（AND と bit_count）だけで求める。
+    """
+
+    def __init__(self, bitsets):
+        # {ファセット: {値: ビットセット}}（値は表示順に並べておく）
+        self.bitsets = bitsets
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        bitsets = {facet: defaultdict(int) for facet in FACETS}
+        meeting_categories = corpus.meeting_categories
+        category_clusters = corpus.category_clusters
+        cluster_items = corpus.cluster_items
+        for meeting_no, meeting_id in enumerate(corpus.meeting_ids):
+            first_category = meeting_categories[meeting_no]
+            last_category = meeting_categories[meeting_no + 1]
+            items = range_bitset(
+                cluster_items[category_clusters[first_category]],
+                cluster_items[category_clusters[last_category]],
+            )
+            bitsets["year"][meeting_year(MeetingView(corpus, meeting_no))] |= items
+            bitsets["meeting"][meeting_id] |= items
+            for category_no in range(first_category, last_category):
+                first_cluster = category_clusters[category_no]
+                last_cluster = category_clusters[category_no + 1]
+                name = corpus.strings[corpus.category_names[category_no]]
+                bitsets["category"][name] |= range_bitset(cluster_items[first_cluster], cluster_items[last_cluster])
+                for cluster_no in range(first_cluster, last_cluster):
+                    keywords = corpus.strings[corpus.cluster_keywords[cluster_no]]
+                    bitsets["cluster_keywords"][keywords] |= range_bitset(
+                        cluster_items[cluster_no], cluster_items[cluster_no + 1]
+                    )
+        bitsets["year"] = dict(sorted(bitsets["year"].items(), reverse=True))
+        return cls({facet: dict(values) for facet, values in bitsets.items()})
+
+    def selection(self, facet, values):
+        """1つのファセットで選ばれた値のいずれかに当たる項目（未選択なら None）"""
+        if not values:
+            return None
+        bitset = 0
+        for value in values:
+            bitset |= self.bitsets[facet].get(value, 0)
+        return bitset
+
+    def apply(self, result, selections, skip=None):
+        """検索結果のビットセットをファセットごとの選択で絞り込む（skip のファセットは除く）"""
+        for facet in FACETS:
+            if facet == skip:
+                continue
+            bitset = self.selection(facet, selections.get(facet))
+            if bitset is not None:
+                result &= bitset
+        return result
+
+    def counts(self, result, selections):
+        """ファセット値ごとの件数を {ファセット: {値: 件数}} で返す（0件の値は除く）
+
+        あるファセットの件数は、そのファセット自身の選択を除いた絞り込み結果に対して数える。
+        これにより同じファセット内で別の値を追加したときの件数が分かる。
+        """
+        counts = {}
+        for facet in FACETS:
+            base = self.apply(result, selections, skip=facet)
+            counts[facet] = {}
+            for value, bitset in self.bitsets[facet].items():
+                count = (base & bitset).bit_count()
+                if count:
+                    counts[facet][value] = count
+        return counts
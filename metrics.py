@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# パーセンタイル計算に使う直近サンプル数（段階ごと）
+METRICS_WINDOW = 2048
+
+class StageMetrics:
+    """段階（コーパス読み込み・照合・ハイライト・描画など）ごとの処理時間を集計する
+
+    プロセス内で共有し、p50/p95 は直近 METRICS_WINDOW 件、件数と最大値は
+    起動以降の全件から求める。
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.maxima = {}
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, stage, seconds):
+        with self.lock:
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+                self.counts[stage] = 0
+                self.maxima[stage] = 0.0
+            self.samples[stage].append(seconds)
+            self.counts[stage] += 1
+            self.maxima[stage] = max(self.maxima[stage], seconds)
+
+    @contextmanager
+    def timed(self, stage):
+        """with ブロックの経過時間を stage として記録する"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def snapshot(self):
+        """段階ごとの件数・p50・p95・最大（ミリ秒）を返す"""
+        with self.lock:
+            stages = {stage: sorted(samples) for stage, samples in self.samples.items()}
+            counts = dict(self.counts)
+            maxima = dict(self.maxima)
+
+        def percentile(values, p):
+            # 最近傍順位法
+            rank = max(0, -(-len(values) * p // 100) - 1)
+            return values[int(rank)]
+
+        return {
+            stage: {
+                "count": counts[stage],
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "max_ms": maxima[stage] * 1000,
+            }
+            for stage, values in stages.items()
+        }
+
+    def to_json(self):
+        return json.dumps({
+            "started_at": self.started_at,
+            "window": self.window,
+            "stages": self.snapshot(),
+        }, ensure_ascii=False, indent=2)
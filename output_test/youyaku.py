@@ -1,8 +1,35 @@
+import argparse
+import hashlib
 import json
 import os
 import re
 from collections import defaultdict
-from janome.tokenizer import Tokenizer
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+import numpy as np
+
+# token_cache はリポジトリ直下のモジュール。リポジトリ直下から
+# python -m output_test.youyaku として実行する（入出力のパスも直下からの相対パス）
+try:
+    from token_cache import get_token_cache
+except ModuleNotFoundError as error:
+    if error.name != "token_cache":
+        raise
+    # python output_test/youyaku.py のようにファイルを直接実行すると直下が読み込み先に入らない
+    raise SystemExit(
+        "token_cache が見つかりません。リポジトリ直下で python -m output_test.youyaku として実行してください"
+    ) from error
+
+# 並列実行時にワーカーへ送る要約ジョブ（クラスタ単位）のまとまりの大きさ
+CHUNK_SIZE = 8
+# ワーカーがこの件数の解析結果をためたら途中でも保存する（終了時にも保存する）
+TOKEN_FLUSH_SIZE = 2048
+# 要約の目標文字数
+TARGET_LENGTH = 150
+# 要約ロジックを変えたら上げる（キャッシュ済みの要約が無効になる）
+SUMMARIZER_VERSION = 1
+# 要約キャッシュの保存先（output_test/*.json はビューアのデータなので避ける）
+SUMMARY_CACHE_FILE = "cache/summaries.json"
 
 def preprocess_text(text):
     """テキストの前処理を強化"""
@@ -15,11 +42,11 @@ def preprocess_text(text):
 
 def extract_keywords(text, cluster_keywords_str="", n=5):
     """キーワード抽出を改良（クラスタキーワードを考慮）"""
-    t = Tokenizer()
     words = []
     
-    for token in t.tokenize(text):
-        pos = token.part_of_speech.split(',')[0]
+    # 形態素解析は本文のハッシュ単位でキャッシュされる
+    for token in get_token_cache().tokenize(text):
+        pos = token.pos
         # 名詞、動詞、形容詞に限定し、記号を除外
         if pos in ['名詞', '動詞', '形容詞'] and token.surface not in ['。', '、']:
             words.append(token.surface)
@@ -38,47 +65,66 @@ def extract_keywords(text, cluster_keywords_str="", n=5):
     
     return sorted(word_counts.items(), key=lambda x: -x[1])[:n]
 
-def summarize_content(text, cluster_keywords="", target_length=150):
-    """改良版要約関数"""
-    if not text or len(text) <= target_length:
-        return text
-    
-    # 文分割（句点できれいに分割）
-    sentences = [s.strip() for s in text.split('。') if s.strip()]
+def split_sentences(text):
+    """文分割（句点できれいに分割）"""
+    return [s.strip() for s in text.split('。') if s.strip()]
+
+def score_sentences(sentence_lists, keyword_lists):
+    """複数項目の文の重要度をまとめて計算する
+
+    全項目の文を1列に並べ、キーワード×文の含有行列を作ってから位置・長さの
+    重みとあわせて配列演算で求める。結果は項目ごとのスコア配列で、1文ずつ
+    計算した場合と一致する。
+    """
+    sentences = [sentence for sentence_list in sentence_lists for sentence in sentence_list]
+    counts = np.array([len(sentence_list) for sentence_list in sentence_lists])
     if not sentences:
-        return ""
-    
-    # キーワード抽出（クラスタキーワードも考慮）
-    keywords = [kw[0] for kw in extract_keywords(text, cluster_keywords)]
-    
-    # 文の重要度評価
-    scored_sentences = []
-    for i, sentence in enumerate(sentences):
-        score = 0
-        
-        # キーワード含有スコア
-        keyword_score = sum(5 for kw in keywords if kw in sentence)
-        score += keyword_score
-        
-        # 文の位置スコア（最初と最後の文を重視）
-        position_score = 1.5 if i == 0 or i == len(sentences)-1 else 1
-        score *= position_score
-        
-        # 文の長さスコア（適度な長さを重視）
-        length_score = min(1, len(sentence)/30)  # 30文字前後を理想とする
-        score *= length_score
-        
-        scored_sentences.append((score, sentence, i))  # 元のインデックスも保持
-    
-    # スコア順にソート
-    scored_sentences.sort(reverse=True, key=lambda x: x[0])
+        return [np.zeros(0) for _ in sentence_lists]
+
+    # 各文がどの項目に属し、項目内の何番目か
+    owner = np.repeat(np.arange(len(sentence_lists)), counts)
+    starts = np.cumsum(counts) - counts
+    index_in_item = np.arange(len(sentences)) - starts[owner]
+
+    # キーワード含有スコア（その項目のキーワードで、文に含まれるものの数×5）
+    # 含有行列は項目ごとのブロック対角になるため、非ゼロになり得る
+    # （文, その項目のキーワード）の組だけを判定する。部分文字列の判定は
+    # np.char より str の in 演算子の方が速いため、判定結果だけを配列にする
+    pair_sentences = np.repeat(
+        np.arange(len(sentences)),
+        [len(keyword_lists[item_no]) for item_no in owner.tolist()]
+    )
+    contains = np.fromiter(
+        (kw in sentence
+         for sentence, item_no in zip(sentences, owner.tolist())
+         for kw in keyword_lists[item_no]),
+        dtype=bool,
+        count=len(pair_sentences)
+    )
+    keyword_score = 5 * np.bincount(pair_sentences[contains], minlength=len(sentences))
+
+    # 文の位置スコア（最初と最後の文を重視）
+    is_edge = (index_in_item == 0) | (index_in_item == counts[owner] - 1)
+    position_score = np.where(is_edge, 1.5, 1.0)
+
+    # 文の長さスコア（適度な長さを重視、30文字前後を理想とする）
+    length_score = np.minimum(1.0, np.array([len(sentence) for sentence in sentences]) / 30)
+
+    scores = keyword_score * position_score * length_score
+    return np.split(scores, np.cumsum(counts)[:-1])
+
+def select_sentences(sentences, scores, target_length=TARGET_LENGTH):
+    """スコアの高い順に文を選び、元の順序で要約文を組み立てる"""
+    # スコア順にソート（同点は元の順序を保つ）
+    order = np.argsort(-scores, kind='stable')
     
     # 要約生成
     selected_indices = set()
     current_length = 0
     summary_sentences = []
     
-    for score, sentence, orig_idx in scored_sentences:
+    for orig_idx in order.tolist():
+        sentence = sentences[orig_idx]
         if current_length + len(sentence) <= target_length:
             selected_indices.add(orig_idx)
             current_length += len(sentence)
@@ -100,51 +146,397 @@ def summarize_content(text, cluster_keywords="", target_length=150):
     # 長さ調整（句点を追加した分を考慮）
     return result[:target_length]
 
-def process_files():
-    """ファイル処理のメイン関数"""
+def summarize_cluster(texts, cluster_keywords="", target_length=TARGET_LENGTH):
+    """同じクラスタの複数項目をまとめて要約する（文のスコアは一括計算）"""
+    summaries = list(texts)
+    pending = []
+    for i, text in enumerate(texts):
+        if not text or len(text) <= target_length:
+            continue
+        sentences = split_sentences(text)
+        if not sentences:
+            summaries[i] = ""
+            continue
+        # キーワード抽出（クラスタキーワードも考慮）
+        keywords = [kw[0] for kw in extract_keywords(text, cluster_keywords)]
+        pending.append((i, sentences, keywords))
+
+    scores = score_sentences([sentences for _, sentences, _ in pending], [keywords for _, _, keywords in pending])
+    for (i, sentences, _), sentence_scores in zip(pending, scores):
+        summaries[i] = select_sentences(sentences, sentence_scores, target_length)
+    return summaries
+
+def summarize_content(text, cluster_keywords="", target_length=TARGET_LENGTH):
+    """改良版要約関数"""
+    return summarize_cluster([text], cluster_keywords, target_length)[0]
+
+def summary_key(processed_text, cluster_keywords, target_length=TARGET_LENGTH):
+    """要約結果を決める入力すべてからキャッシュキーを作る"""
+    payload = json.dumps(
+        [SUMMARIZER_VERSION, target_length, cluster_keywords, processed_text],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_summary_cache(cache_file=SUMMARY_CACHE_FILE):
+    """保存済みの要約キャッシュを読み込む（無ければ空）"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_summary_cache(cache, cache_file=SUMMARY_CACHE_FILE):
+    """要約キャッシュを一時ファイル経由で置き換え保存する"""
+    os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+    temp_file = f"{cache_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(temp_file, cache_file)
+
+def summarize_job(job):
+    """要約ジョブ（前処理済み本文のリスト, クラスタキーワード）をまとめて処理する"""
+    processed_texts, cluster_keywords = job
+    try:
+        try:
+            # 要約（クラスタキーワードを渡す）
+            return summarize_cluster(processed_texts, cluster_keywords)
+        except Exception:
+            # どの項目で失敗したかを残すため、1件ずつやり直す
+            summaries = []
+            for processed_text in processed_texts:
+                try:
+                    summaries.append(summarize_content(processed_text, cluster_keywords))
+                except Exception as e:
+                    # 失敗は年度単位で報告するため、例外を結果として持ち帰る
+                    summaries.append(e)
+            return summaries
+    finally:
+        # 保存はワーカーの終了時にまとめて行い、たまりすぎたときだけ途中で書き出す
+        token_cache = get_token_cache()
+        if len(token_cache.pending) >= TOKEN_FLUSH_SIZE:
+            token_cache.flush()
+
+def collect_jobs(data):
+    """要約対象の項目と要約ジョブを文書順に集める"""
+    targets = []
+    jobs = []
+    for meeting in data:
+        if not isinstance(meeting, dict):
+            continue
+            
+        if 'categories' in meeting:
+            for category in meeting['categories']:
+                if not isinstance(category, dict):
+                    continue
+                    
+                if 'clusters' in category:
+                    for cluster in category['clusters']:
+                        if not isinstance(cluster, dict):
+                            continue
+                            
+                        if 'items' in cluster:
+                            for item in cluster['items']:
+                                if not isinstance(item, dict):
+                                    continue
+                                    
+                                if 'body' in item and 'cluster_keywords' in cluster:
+                                    targets.append(item)
+                                    # 前処理
+                                    jobs.append((preprocess_text(item['body']), cluster['cluster_keywords']))
+    return targets, jobs
+
+def init_worker():
+    """ワーカー起動時に保存済みの形態素解析結果を読み込み、終了時の保存を登録する"""
+    Finalize(None, get_token_cache().flush, exitpriority=10)
+
+def make_executor(workers):
+    """要約用のプロセスプールを作る（workers=1 なら同じプロセスで処理するため None）"""
+    if workers == 1:
+        init_worker()
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+
+def submit_pending(jobs, keys, cache, executor, submitted=None):
+    """キャッシュに無い入力だけを（重複を除いて）要約に回し、collect_pending に渡す組を返す
+
+    同じクラスタキーワードの連続する項目は1つのジョブにまとめて送る。プロセスプールでは
+    この時点で投入まで済ませ、結果は collect_pending で受け取る。submitted には投入済みの
+    キーを集め、それらは再び投入しない（前の年度で投入した要約を待つ場合など）。
+    """
+    pending = {}
+    for job, key in zip(jobs, keys):
+        if key not in cache and (submitted is None or key not in submitted):
+            pending.setdefault(key, job)
+    if submitted is not None:
+        submitted.update(pending)
+
+    batches = []
+    for key, (processed_text, cluster_keywords) in pending.items():
+        if batches and batches[-1][1] == cluster_keywords:
+            batches[-1][0].append(key)
+            batches[-1][2].append(processed_text)
+        else:
+            batches.append(([key], cluster_keywords, [processed_text]))
+    batch_jobs = [(texts, cluster_keywords) for _, cluster_keywords, texts in batches]
+
+    if executor is None:
+        results = map(summarize_job, batch_jobs)
+    else:
+        results = executor.map(summarize_job, batch_jobs, chunksize=CHUNK_SIZE)
+    return batches, results
+
+def collect_pending(batches, results):
+    """submit_pending で回した要約を待ち、キー→要約の辞書を返す"""
+    computed = {}
+    for (batch_keys, _, _), summaries in zip(batches, results):
+        computed.update(zip(batch_keys, summaries))
+    return computed
+
+def summarize_pending(jobs, keys, cache, executor):
+    """キャッシュに無い入力だけを（重複を除いて）要約し、キー→要約の辞書を返す"""
+    return collect_pending(*submit_pending(jobs, keys, cache, executor))
+
+def apply_summaries(targets, keys, cache, computed):
+    """要約を項目の本文に書き戻す（失敗した項目があれば例外を送出）"""
+    for item, key in zip(targets, keys):
+        summary = cache[key] if key in cache else computed[key]
+        if isinstance(summary, Exception):
+            raise summary
+        item['body'] = summary
+
+# 配列の要素の境界を探すときに立ち止まる文字（文字列の外と中）
+JSON_STRUCTURE = re.compile(r'[\[\]{}",]')
+# 文字列の中身（エスケープを含む）。閉じる '"' の手前か、読めている範囲の末尾で止まる
+JSON_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """トップレベルがJSON配列のファイルから要素を1つずつ読み出す
+
+    要素の終わり（深さ0の ',' か ']'）を括弧と文字列だけ追って探し、見つかってから
+    1回だけデコードする。読み足したときは走査済みの位置から続けるので、大きな要素でも
+    読み足すたびに先頭から解析し直すことはない。
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        # 読み残しが大きいほど多く読み、大きな要素でも連結のコピーを合計で線形に抑える
+        chunk = f.read(max(chunk_size, len(buffer) - position))
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            fill()
+
+    def element_end():
+        """position から始まる要素の直後の区切り文字の位置（ファイル末尾なら len(buffer)）"""
+        # 読み足すと buffer の先頭が position にずれるため、走査位置は position からの距離で持つ
+        scanned = 0
+        depth = 0
+        in_string = False
+        while True:
+            index = position + scanned
+            while index < len(buffer):
+                if in_string:
+                    index = JSON_STRING_BODY.match(buffer, index).end()
+                    if buffer[index:index + 1] != '"':
+                        # 文字列かエスケープの途中で読めている範囲が尽きた
+                        break
+                    index += 1
+                    in_string = False
+                    continue
+                match = JSON_STRUCTURE.search(buffer, index)
+                if match is None:
+                    index = len(buffer)
+                    break
+                char = match.group()
+                index = match.end()
+                if char == '"':
+                    in_string = True
+                elif char in '[{':
+                    depth += 1
+                elif depth > 0 and char in ']}':
+                    depth -= 1
+                elif depth == 0 and char in ',]}':
+                    return match.start()
+            if eof:
+                return len(buffer)
+            scanned = index - position
+            fill()
+
+    skip_whitespace()
+    if buffer[position:position + 1] != '[':
+        raise json.JSONDecodeError("Expecting '['", buffer, position)
+    position += 1
+    skip_whitespace()
+    if buffer[position:position + 1] == ']':
+        return
+
+    while True:
+        delimiter = element_end()
+        element, end = decoder.raw_decode(buffer, position)
+        while end < delimiter and buffer[end].isspace():
+            end += 1
+        if end != delimiter:
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, end)
+        yield element
+        position = end
+        if buffer[position:position + 1] == ',':
+            position += 1
+            skip_whitespace()
+        elif buffer[position:position + 1] == ']':
+            return
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+
+def write_json_array(f, elements):
+    """json.dump(..., indent=2) と同じ書式で配列を1要素ずつ書き出す"""
+    first = True
+    for element in elements:
+        text = json.dumps(element, ensure_ascii=False, indent=2, separators=(',', ': '))
+        # 文字列中の改行はエスケープされるため、行頭の字下げを足すだけで入れ子の書式になる
+        f.write(('[\n  ' if first else ',\n  ') + text.replace('\n', '\n  '))
+        first = False
+    f.write('[]' if first else '\n]')
+
+def process_files(workers=None, cache_file=SUMMARY_CACHE_FILE, stream=False):
+    """ファイル処理のメイン関数
+
+    年度ごとの要約ジョブを1つのプロセスプールに続けて投入し、年度の結果が揃い次第
+    書き出す（メモリに持つのは2年度分まで）。各ワーカーは形態素解析キャッシュを
+    1つだけ持ち続ける。workers=1 のときは同じプロセスで処理する。
+    cache_file を指定すると、前回と入力が同じ項目は保存済みの要約を再利用する。
+    保存し直すキャッシュは今回の入力で使った要約だけにし、消えた入力の分は持ち越さない。
+    stream=True では会議を1件ずつ読み込み・要約・書き出しし、メモリ使用量を
+    最大の会議1件分に抑える。
+    """
     # 出力ディレクトリ作成
     output_dir = "output_test"
     os.makedirs(output_dir, exist_ok=True)
 
+    cache = load_summary_cache(cache_file) if cache_file else {}
+    # 今回の入力の要約キー
+    used_keys = set()
+    executor = make_executor(workers)
+    try:
+        if stream:
+            reused, computed_count = process_files_streaming(output_dir, cache, executor, used_keys)
+        else:
+            reused, computed_count = process_files_batch(output_dir, cache, executor, used_keys)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        # ワーカーが書き出したシャードを1つのファイルにまとめる
+        get_token_cache().compact()
+
+    print(f"要約キャッシュ: 再利用 {reused}件 / 新規要約 {computed_count}件")
+    if cache_file:
+        save_summary_cache({key: cache[key] for key in used_keys if key in cache}, cache_file)
+
+    print("全ての年度の処理が完了しました")
+
+def process_files_batch(output_dir, cache, executor, used_keys):
+    """年度ごとに読み込んで要約に回し、前の年度の結果を書き出しながら次の年度を読む
+
+    プロセスプールは年度をまたいで埋まったままになり、メモリに持つ年度は
+    要約中の年度と読み込み中の年度の2つまでになる（会議1件分に抑えるなら --stream）。
+    """
+    reused = 0
+    computed = {}
+    submitted = set()
+    in_flight = None
+
+    def finish(year, data, targets, keys, batches, results):
+        output_file = f"{output_dir}/{year}.json"  # output_test内に保存
+        try:
+            computed.update(collect_pending(batches, results))
+            apply_summaries(targets, keys, cache, computed)
+
+            # 読み込み中のビューアが書きかけのファイルを読まないよう、一時ファイルから置き換える
+            temp_file = f"{output_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
+            os.replace(temp_file, output_file)
+
+            print(f"要約完了: {year}.json")
+
+        except Exception as e:
+            print(f"{year}年処理中にエラー: {str(e)}")
+        # 後の年度は同じ要約をキャッシュから引く
+        cache.update((key, summary) for key, summary in computed.items() if not isinstance(summary, Exception))
+
     # 2015年から2024年まで処理
     for year in range(2015, 2025):
         input_file = f"outputs/{year}.json"
-        output_file = f"{output_dir}/{year}.json"  # output_test内に保存
         
         try:
             with open(input_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
+            targets, jobs = collect_jobs(data)
+            keys = [summary_key(*job) for job in jobs]
+            used_keys.update(keys)
+            reused += sum(1 for key in keys if key in cache and key not in submitted)
+            batches, results = submit_pending(jobs, keys, cache, executor, submitted)
 
-            for meeting in data:
-                if not isinstance(meeting, dict):
-                    continue
-                    
-                if 'categories' in meeting:
-                    for category in meeting['categories']:
-                        if not isinstance(category, dict):
-                            continue
-                            
-                        if 'clusters' in category:
-                            for cluster in category['clusters']:
-                                if not isinstance(cluster, dict):
-                                    continue
-                                    
-                                if 'items' in cluster:
-                                    for item in cluster['items']:
-                                        if not isinstance(item, dict):
-                                            continue
-                                            
-                                        if 'body' in item and 'cluster_keywords' in cluster:
-                                            # 前処理
-                                            processed_text = preprocess_text(item['body'])
-                                            # 要約（クラスタキーワードを渡す）
-                                            item['body'] = summarize_content(
-                                                processed_text,
-                                                cluster['cluster_keywords']
-                                            )
-
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
+        except FileNotFoundError:
+            print(f"ファイルが見つかりません: {input_file}")
+            continue
+        except json.JSONDecodeError:
+            print(f"JSON解析エラー: {input_file}")
+            continue
+        except Exception as e:
+            print(f"{year}年処理中にエラー: {str(e)}")
+            continue
+
+        if in_flight is not None:
+            finish(*in_flight)
+        in_flight = (year, data, targets, keys, batches, results)
+
+    if in_flight is not None:
+        finish(*in_flight)
+    return reused, len(computed)
+
+def process_files_streaming(output_dir, cache, executor, used_keys):
+    """会議を1件ずつ読み込み・要約・書き出しする"""
+    reused = 0
+    computed_count = 0
+
+    def summarize_meetings(meetings):
+        nonlocal reused, computed_count
+        for meeting in meetings:
+            targets, jobs = collect_jobs([meeting])
+            keys = [summary_key(*job) for job in jobs]
+            used_keys.update(keys)
+            reused += sum(1 for key in keys if key in cache)
+            computed = summarize_pending(jobs, keys, cache, executor)
+            computed_count += len(computed)
+            apply_summaries(targets, keys, cache, computed)
+            cache.update((key, summary) for key, summary in computed.items() if not isinstance(summary, Exception))
+            yield meeting
+
+    for year in range(2015, 2025):
+        input_file = f"outputs/{year}.json"
+        output_file = f"{output_dir}/{year}.json"  # output_test内に保存
+        # 途中で失敗しても前回の出力を壊さないよう、一時ファイルに書いてから置き換える
+        temp_file = f"{output_file}.tmp"
+        
+        try:
+            with open(input_file, 'r', encoding='utf-8') as f_in, \
+                    open(temp_file, 'w', encoding='utf-8') as f_out:
+                write_json_array(f_out, summarize_meetings(iter_json_array(f_in)))
+            os.replace(temp_file, output_file)
 
             print(f"要約完了: {year}.json")
 
@@ -154,8 +546,20 @@ def process_files():
             print(f"JSON解析エラー: {input_file}")
         except Exception as e:
             print(f"{year}年処理中にエラー: {str(e)}")
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
 
-    print("全ての年度の処理が完了しました")
+    return reused, computed_count
+
+def main():
+    parser = argparse.ArgumentParser(description="年度別の議事録JSONを要約する（python -m output_test.youyaku で実行）")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="並列プロセス数（既定はCPU数）")
+    parser.add_argument("--cache-file", default=SUMMARY_CACHE_FILE, help="要約キャッシュの保存先")
+    parser.add_argument("--no-cache", action="store_true", help="要約キャッシュを使わずにすべて要約し直す")
+    parser.add_argument("--stream", action="store_true", help="会議単位で読み書きしてメモリ使用量を抑える")
+    args = parser.parse_args()
+    process_files(args.workers, None if args.no_cache else args.cache_file, args.stream)
 
 if __name__ == "__main__":
-    process_files()
+    main()
@@ -0,0 +1,109 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+class PositionalIndex:
+    """正規化済み本文の文字bigramごとの出現位置（語句・近接検索用）
+
+    bigramごとに1本のuint32配列 [項目数 n, 項目ID×n, 位置の開始×(n+1), 位置...] を持つ
+    （5万を超えるbigramごとに配列を分けるとオブジェクトの負担が大きいため）。
+    先頭の項目ID（昇順）と開始位置が飛び先の表になっており、候補の項目だけを
+    二分探索で引いて位置を取り出す。2文字以上の語句の出現は、i 文字目から始まる
+    bigramが位置 p+i に現れるかを出現の少ないbigramから順に確かめて求める。
+    """
+
+    def __init__(self, postings):
+        self.postings = postings
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        item_ids = defaultdict(lambda: array("I"))
+        positions = defaultdict(lambda: array("I"))
+        starts = defaultdict(lambda: array("I"))
+        for item_id, text in enumerate(corpus.item_bodies_normalized):
+            grams = defaultdict(list)
+            for position in range(len(text) - 1):
+                grams[text[position:position + 2]].append(position)
+            for gram, gram_positions in grams.items():
+                gram_starts = starts[gram]
+                gram_starts.append(len(positions[gram]))
+                item_ids[gram].append(item_id)
+                positions[gram].extend(gram_positions)
+
+        postings = {}
+        for gram in list(item_ids):
+            posting = array("I", [len(item_ids[gram])])
+            posting.extend(item_ids.pop(gram))
+            posting.extend(starts.pop(gram))
+            posting.append(len(positions[gram]))
+            posting.extend(positions.pop(gram))
+            postings[gram] = posting
+        return cls(postings)
+
+    def item_count(self, gram):
+        """bigramを含む項目の数"""
+        posting = self.postings.get(gram)
+        return 0 if posting is None else posting[0]
+
+    def gram_positions(self, gram, item_ids=None):
+        """bigramの出現位置を {項目ID: 位置の配列} で返す（item_ids を渡すとその項目だけ）
+
+        item_ids がbigramを含む項目より少なければ、候補ごとに二分探索して引く。
+        """
+        posting = self.postings.get(gram)
+        if posting is None:
+            return {}
+        count = posting[0]
+        base = 2 + 2 * count
+        if item_ids is None:
+            indexes = range(count)
+        elif len(item_ids) < count:
+            indexes = []
+            for item_id in item_ids:
+                index = bisect_left(posting, item_id, 1, 1 + count)
+                if index <= count and posting[index] == item_id:
+                    indexes.append(index - 1)
+        else:
+            indexes = [index for index in range(count) if posting[1 + index] in item_ids]
+        return {
+            posting[1 + index]: posting[base + posting[1 + count + index]:base + posting[2 + count + index]]
+            for index in indexes
+        }
+
+    def phrase_positions(self, phrase, item_ids=None):
+        """2文字以上の語句（正規化済み）の出現開始位置を {項目ID: [位置, ...]} で返す"""
+        grams = [phrase[i:i + 2] for i in range(len(phrase) - 1)]
+        # 出現する項目の少ないbigramから確かめ、候補を早く絞る
+        order = sorted(range(len(grams)), key=lambda i: self.item_count(grams[i]))
+        anchor = order[0]
+        result = {}
+        for item_id, positions in self.gram_positions(grams[anchor], item_ids).items():
+            starts = [position - anchor for position in positions if position >= anchor]
+            if starts:
+                result[item_id] = starts
+        for offset in order[1:]:
+            if not result:
+                break
+            found = self.gram_positions(grams[offset], result.keys())
+            narrowed = {}
+            for item_id, starts in result.items():
+                positions = found.get(item_id)
+                if positions is None:
+                    continue
+                positions = set(positions)
+                starts = [start for start in starts if start + offset in positions]
+                if starts:
+                    narrowed[item_id] = starts
+            result = narrowed
+        return result
+
+def is_near(starts, length, other_starts, other_length, distance):
+    """2つの語句の出現のうち、間の文字数が distance 以下（重なりを含む）の組があるか
+
+    other_starts は昇順であること。
+    """
+    for start in starts:
+        index = bisect_left(other_starts, start - other_length - distance)
+        if index < len(other_starts) and other_starts[index] <= start + length + distance:
+            return True
+    return False
@@ -0,0 +1,93 @@
+import heapq
+import math
+from array import array
+from collections import Counter, defaultdict
+
+from corpus import normalize_text
+from search_engine import parse_query
+from token_cache import SEARCH_TOKEN_CACHE_DIR, get_token_cache
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 索引に使う品詞（助詞・助動詞・記号などは関連度の手がかりにならないため除く）
+INDEX_POS = frozenset({"名詞", "動詞", "形容詞", "副詞"})
+# 語頻度は uint16 で持つ
+MAX_TERM_FREQUENCY = 65535
+
+def index_terms(tokens):
+    """トークン列から索引語（内容語の表層形を正規化したもの）を取り出す"""
+    return [normalize_text(token.surface) for token in tokens if token.pos in INDEX_POS and token.surface.strip()]
+
+class BM25Index:
+    """janomeのトークンに基づくBM25の語統計
+
+    語ごとに出現項目ID（昇順）と語頻度の配列、項目ごとに文書長から求めた
+    正規化項 k1*(1-b+b*dl/avgdl) を事前に計算しておき、検索時は
+    クエリ語の出現リストをなめて加算するだけにする。
+    """
+
+    def __init__(self, postings, doc_lengths, k1=BM25_K1, b=BM25_B):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        doc_count = len(doc_lengths)
+        average_length = sum(doc_lengths) / doc_count if doc_count else 0.0
+        self.norms = array("d", (
+            k1 * (1 - b + b * length / average_length) if average_length else k1
+            for length in doc_lengths
+        ))
+        self.idf = {
+            term: math.log(1 + (doc_count - len(item_ids) + 0.5) / (len(item_ids) + 0.5))
+            for term, (item_ids, _) in postings.items()
+        }
+
+    @classmethod
+    def from_corpus(cls, corpus, token_cache=None):
+        """コーパスの見出しと本文を形態素解析して語統計を作る（解析結果はTokenCacheに保存する）"""
+        if token_cache is None:
+            token_cache = get_token_cache(SEARCH_TOKEN_CACHE_DIR)
+        item_ids = defaultdict(lambda: array("I"))
+        frequencies = defaultdict(lambda: array("H"))
+        doc_lengths = array("I")
+        for item_id in range(len(corpus)):
+            terms = index_terms(token_cache.tokenize(corpus.item_heads[item_id]))
+            terms += index_terms(token_cache.tokenize(corpus.item_bodies[item_id]))
+            doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                item_ids[term].append(item_id)
+                frequencies[term].append(min(frequency, MAX_TERM_FREQUENCY))
+        token_cache.flush()
+        postings = {term: (item_ids[term], frequencies[term]) for term in item_ids}
+        return cls(postings, doc_lengths)
+
+    def query_terms(self, search_query, token_cache=None):
+        """クエリをキーワード（語句）ごとに形態素解析して索引語にする（近接演算子は除く）"""
+        if token_cache is None:
+            token_cache = get_token_cache(SEARCH_TOKEN_CACHE_DIR)
+        terms = []
+        for keyword in parse_query(search_query)[0]:
+            terms += index_terms(token_cache.tokenize(keyword, store=False))
+        return list(dict.fromkeys(terms))
+
+    def scores(self, terms):
+        """クエリ語を1つ以上含む項目のスコアを {項目ID: スコア} で返す"""
+        k1_plus_1 = self.k1 + 1
+        norms = self.norms
+        scores = defaultdict(float)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            idf = self.idf[term]
+            for item_id, frequency in zip(*posting):
+                scores[item_id] += idf * frequency * k1_plus_1 / (frequency + norms[item_id])
+        return scores
+
+    def top_k(self, item_ids, search_query, k):
+        """item_ids のうちスコアの高い k 件を、ヒープで選んで高い順に返す
+
+        同点（クエリ語を含まない項目を含む）は項目IDの昇順、つまり掲載順に並べる。
+        """
+        scores = self.scores(self.query_terms(search_query))
+        return heapq.nsmallest(k, item_ids, key=lambda item_id: (-scores.get(item_id, 0.0), item_id))
@@ -0,0 +1,317 @@
+import re
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+
+from corpus import normalize_text, normalize_with_offsets, original_span
+from facets import FACETS, bitset_ids, to_bitset
+from positions import is_near
+
+QUERY_CACHE_SIZE = 512
+# ページ単位の検索結果（ハイライト済み）をキャッシュする件数
+RESULT_CACHE_SIZE = 1024
+# 並び順（掲載順は年度別JSONの並びで既定、関連度順はBM25）
+SORT_ORDERS = ("document", "relevance")
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# クエリの要素（"..." で囲んだ語句か、空白を含まない語）と近接演算子 ~N
+QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+PROXIMITY_OPERATOR = re.compile(r"~(\d+)")
+
+class NotReadyError(RuntimeError):
+    """ウォームアップが終わっておらず、まだ検索できない"""
+
+class QueryCache:
+    """全セッションで共有する照合結果のLRUキャッシュ"""
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+            }
+
+def parse_query(search_query):
+    """クエリを正規化した語（語句）の列と近接条件 [(語, 語, 文字数), ...] に分ける
+
+    空白区切りの語はそれぞれを含むこと、"..." で囲んだ語句はそのまま続けて含むこと、
+    「語 ~N 語」は2つの語の間が N 文字以内（順不同）であることを表す。
+    本文にはほとんど空白が無いため、語句の中の空白は取り除く（"待機 児童" は「待機児童」）。
+    """
+    terms = []
+    proximities = []
+    distance = None
+    for match in QUERY_TOKEN.finditer(search_query):
+        phrase, word = match.groups()
+        operator = PROXIMITY_OPERATOR.fullmatch(word) if word is not None else None
+        if operator and terms:
+            distance = int(operator.group(1))
+            continue
+        term = normalize_text(word) if phrase is None else "".join(normalize_text(phrase).split())
+        if not term:
+            continue
+        if distance is not None:
+            proximities.append((terms[-1], term, distance))
+            distance = None
+        terms.append(term)
+    return terms, proximities
+
+def normalize_query(search_query):
+    """照合結果が同じになるクエリを同一のキーにまとめる"""
+    terms, proximities = parse_query(search_query)
+    return (
+        tuple(sorted(set(terms))),
+        tuple(sorted({(min(a, b), max(a, b), distance) for a, b, distance in proximities})),
+    )
+
+@lru_cache(maxsize=256)
+def highlight_pattern(query):
+    """クエリ中の全キーワード（語句）を正規化し、1つの選択パターンにまとめてコンパイルする"""
+    # 重複を除き、長いキーワードを優先して一致させる
+    keywords = sorted(set(parse_query(query)[0]), key=len, reverse=True)
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+def highlight_normalized(text, normalized, offset_map, query):
+    """正規化済みの文字列上でキーワードを探し、元の文字列の対応する範囲をハイライトする"""
+    if not query:
+        return text
+
+    pattern = highlight_pattern(query)
+    if pattern is None:
+        return text
+    pieces = []
+    position = 0
+    for match in pattern.finditer(normalized):
+        start, end = original_span(offset_map, match.start(), match.end())
+        if start < position:
+            continue
+        pieces.append(text[position:start])
+        pieces.append(f'<span class="highlight">{text[start:end]}</span>')
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+def highlight_search_term(text, query):
+    """検索クエリをハイライト表示する（全角・半角や大文字・小文字の違いは区別しない）"""
+    if not query:
+        return text
+    normalized, offset_map = normalize_with_offsets(text)
+    return highlight_normalized(text, normalized, offset_map, query)
+
+def find_occurrences(text, term):
+    """文字列中の語の出現開始位置を昇順で返す（重なる出現も含む）"""
+    starts = []
+    position = text.find(term)
+    while position != -1:
+        starts.append(position)
+        position = text.find(term, position + 1)
+    return starts
+
+def match_items(corpus, search_query, positions=None):
+    """すべての語（語句）を本文に含み、近接条件を満たす項目IDを返す（ハイライトは行わない）
+
+    positions（PositionalIndex）を渡すと、2文字以上の語句の有無と出現位置を
+    本文の走査ではなく位置インデックスから求める。
+    """
+    # 照合は正規化済みの列に対して行う
+    terms, proximities = parse_query(search_query)
+    bodies_normalized = corpus.item_bodies_normalized
+    candidates = corpus.find_candidates(terms)
+
+    # {語: {項目ID: 出現位置}}（位置インデックスで引けた語のみ）
+    found = {}
+    if positions is not None:
+        candidate_set = set(candidates)
+        for term in set(terms):
+            if len(term) >= 2:
+                found[term] = positions.phrase_positions(term, candidate_set)
+
+    def contains(item_id, term):
+        if term in found:
+            return item_id in found[term]
+        return bodies_normalized.contains(item_id, term)
+
+    def occurrences(item_id, term):
+        if term in found:
+            return found[term][item_id]
+        return find_occurrences(bodies_normalized[item_id], term)
+
+    matched = [item_id for item_id in candidates if all(contains(item_id, term) for term in terms)]
+    if proximities:
+        matched = [
+            item_id for item_id in matched
+            if all(
+                is_near(occurrences(item_id, a), len(a), occurrences(item_id, b), len(b), distance)
+                for a, b, distance in proximities
+            )
+        ]
+    return matched
+
+def build_result(corpus, item_id, search_query):
+    """検索結果1件分の表示用データをハイライト付きで作る"""
+    item = corpus.item(item_id)
+    meeting = item.meeting
+    return {
+        "item_id": item_id,
+        "meeting_id": meeting.meeting_id,
+        # 元データに date が無い会議だけ「記載なし」にする（空文字列はそのまま）
+        "date": "記載なし" if meeting.date is None else meeting.date,
+        "category": item.category.name,
+        "cluster_keywords": item.cluster.keywords,
+        "item": {
+            "head": highlight_normalized(
+                item.head, corpus.item_heads_normalized[item_id],
+                corpus.item_head_offset_maps.get(item_id), search_query
+            ),
+            "body": highlight_normalized(
+                item.body, corpus.item_bodies_normalized[item_id],
+                corpus.item_body_offset_maps.get(item_id), search_query
+            )
+        }
+    }
+
+def search_items(corpus, search_query):
+    return [build_result(corpus, item_id, search_query) for item_id in match_items(corpus, search_query)]
+
+class SearchEngine:
+    """Streamlitに依存しない検索の入口
+
+    CorpusStore のスナップショット（コーパスと絞り込み・関連度の派生物）と
+    照合結果のキャッシュを使い、1件のクエリを照合・絞り込み・並べ替え・
+    ページ切り出し・ハイライトまで行って構造化した結果を返す。
+    アプリ（stream2.py）とHTTPサービス（search_server.py）で共有する。
+    返した結果はページ単位でもキャッシュし、同じ検索の繰り返しは照合から
+    やり直さない（結果の辞書は共有されるため、呼び出し側で書き換えないこと）。
+    render_hit を渡すと各ヒットの表示用HTMLを "card" に入れ、結果と一緒にキャッシュする。
+    """
+
+    def __init__(self, store, query_cache=None, metrics=None, result_cache=None, render_hit=None):
+        self.store = store
+        self.query_cache = query_cache if query_cache is not None else QueryCache()
+        self.result_cache = result_cache if result_cache is not None else QueryCache(RESULT_CACHE_SIZE)
+        self.metrics = metrics
+        self.render_hit = render_hit
+
+    def timed(self, stage):
+        return self.metrics.timed(stage) if self.metrics is not None else nullcontext()
+
+    def match(self, corpus, search_query, positions=None):
+        """照合結果（項目IDのタプル）をバージョン印と正規化クエリをキーにキャッシュして返す"""
+        return self.query_cache.get_or_compute(
+            (corpus.version, normalize_query(search_query)),
+            lambda: tuple(match_items(corpus, search_query, positions))
+        )
+
+    def search(self, search_query, page=0, per_page=DEFAULT_PAGE_SIZE, sort="document", filters=None):
+        """クエリを検索し、指定ページ（0始まり）のヒットと件数・ファセット件数を返す
+
+        filters は {ファセット: [値, ...]}。関連度の語統計が準備中のときは
+        掲載順で返し、実際に使った並び順を結果の sort に入れる。
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"並び順が不正です: {sort}")
+        if filters is not None and not isinstance(filters, dict):
+            raise ValueError("filters は {ファセット: [値, ...]} の形で指定してください")
+        filters = {
+            facet: [values] if isinstance(values, str) else list(values)
+            for facet, values in (filters or {}).items() if values
+        }
+        for facet in filters:
+            if facet not in FACETS:
+                raise ValueError(f"ファセットが不正です: {facet}")
+        per_page = max(1, min(int(per_page), MAX_PAGE_SIZE))
+
+        snapshot = self.store.snapshot()
+        if snapshot is None:
+            raise NotReadyError("検索データを準備しています")
+        # 派生物の揃い具合で並び順や件数の有無が変わるため、キーに含める
+        key = (
+            snapshot.corpus.version, tuple(sorted(snapshot.derived)), normalize_query(search_query),
+            int(page), per_page, sort, tuple(sorted((facet, tuple(values)) for facet, values in filters.items())),
+        )
+        result = self.result_cache.get_or_compute(
+            key, lambda: self.compute(snapshot, search_query, int(page), per_page, sort, filters)
+        )
+        return dict(result, query=search_query)
+
+    def compute(self, snapshot, search_query, page, per_page, sort, filters):
+        corpus = snapshot.corpus
+
+        # 件数は照合結果だけから求め、ハイライトは返すページのみ行う
+        with self.timed("match"):
+            matched_ids = self.match(corpus, search_query, snapshot.derived.get("positions"))
+        total = len(matched_ids)
+
+        # 絞り込みと件数はビットセットの AND と bit_count で求める
+        facets = snapshot.derived.get("facets")
+        facet_counts = None
+        if facets is not None:
+            with self.timed("facets"):
+                result_bitset = to_bitset(matched_ids)
+                facet_counts = facets.counts(result_bitset, filters)
+                if filters:
+                    matched_ids = bitset_ids(facets.apply(result_bitset, filters))
+
+        page_count = max(1, -(-len(matched_ids) // per_page))
+        page = max(0, min(page, page_count - 1))
+        ranker = snapshot.derived.get("ranker")
+        if sort == "relevance" and ranker is None:
+            sort = "document"
+        if sort == "relevance":
+            # 返すページまでの上位だけをヒープで選び、全件は並べ替えない
+            with self.timed("rank"):
+                ranked_ids = ranker.top_k(matched_ids, search_query, (page + 1) * per_page)
+            page_ids = ranked_ids[page * per_page:]
+        else:
+            page_ids = matched_ids[page * per_page:(page + 1) * per_page]
+
+        with self.timed("highlight"):
+            hits = [build_result(corpus, item_id, search_query) for item_id in page_ids]
+        if self.render_hit is not None:
+            with self.timed("cards"):
+                for hit in hits:
+                    hit["card"] = self.render_hit(hit)
+        return {
+            "query": search_query,
+            "total": total,
+            "count": len(matched_ids),
+            "page": page,
+            "per_page": per_page,
+            "page_count": page_count,
+            "sort": sort,
+            "filters": filters,
+            "facets": facet_counts,
+            "hits": hits,
+        }
@@ -0,0 +1,174 @@
+import argparse
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from corpus import DATA_DIR, INDEX_FILE
+from corpus_store import SEARCH_BUILDERS, CorpusStore
+from facets import FACETS
+from metrics import StageMetrics
+from search_engine import DEFAULT_PAGE_SIZE, NotReadyError, SearchEngine
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 1回のリクエストでまとめて受け付けるクエリ数の上限
+MAX_BATCH_SIZE = 100
+MAX_BODY_BYTES = 1 << 20
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """検索エンジンをJSONで公開するハンドラ
+
+    GET  /health                     準備状況とコーパスの情報
+    GET  /metrics                    段階別の処理時間と照合結果キャッシュの統計
+    GET  /search?q=...&page=0&per_page=20&sort=document&year=2020&category=...
+    POST /search  {"queries": [{"query": ..., "page": ..., "per_page": ..., "sort": ..., "filters": {...}}]}
+                  （"queries" を省略して1件分のオブジェクトを送ってもよい）
+    q は空白区切りの語、"..." の語句、「語 ~N 語」の近接条件（search_engine.parse_query）。
+    page は0始まり。ファセットの値は GET では同名のパラメータを繰り返して渡す。
+    """
+    server_version = "TokyoMinutesSearch/1"
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に書くため、Nagleで応答が遅れないようにする
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            store = self.server.engine.store
+            self.send_json(200, {"status": store.status(), **store.stats()})
+        elif url.path == "/metrics":
+            engine = self.server.engine
+            self.send_json(200, {
+                "stages": engine.metrics.snapshot(),
+                "query_cache": engine.query_cache.stats(),
+                "result_cache": engine.result_cache.stats(),
+            })
+        elif url.path == "/search":
+            params = parse_qs(url.query)
+            request = {
+                "query": params.get("q", [""])[0],
+                "page": params.get("page", [0])[0],
+                "per_page": params.get("per_page", [DEFAULT_PAGE_SIZE])[0],
+                "sort": params.get("sort", ["document"])[0],
+                "filters": {facet: params[facet] for facet in FACETS if facet in params},
+            }
+            self.respond(lambda: self.run_query(request))
+        else:
+            self.send_json(404, {"error": f"不明なパスです: {url.path}"})
+
+    def do_POST(self):
+        # 接続を使い回すため、応答の前に本文を読み切る（読めない・大きすぎる本文は接続ごと閉じる）
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_json(400, {"error": "Content-Length が不正です"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self.send_json(413, {"error": "リクエストが大きすぎます"})
+            return
+        data = self.rfile.read(length)
+        if urlparse(self.path).path != "/search":
+            self.send_json(404, {"error": f"不明なパスです: {self.path}"})
+            return
+        try:
+            body = json.loads(data or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": "JSONとして読み込めません"})
+            return
+        if not isinstance(body, dict):
+            self.send_json(400, {"error": "JSONオブジェクトを送ってください"})
+            return
+        if "queries" not in body:
+            self.respond(lambda: self.run_query(body))
+            return
+        queries = body["queries"]
+        if not isinstance(queries, list) or len(queries) > MAX_BATCH_SIZE:
+            self.send_json(400, {"error": f"queries は{MAX_BATCH_SIZE}件以下の配列で指定してください"})
+            return
+        self.respond(lambda: {"results": [self.run_batch_entry(request) for request in queries]})
+
+    def run_query(self, request):
+        if not isinstance(request, dict) or not isinstance(request.get("query"), str):
+            raise ValueError("query を文字列で指定してください")
+        # 空のクエリは全件に一致するため受け付けない
+        if not request["query"].strip():
+            raise ValueError("query が空です")
+        return self.server.engine.search(
+            request["query"],
+            page=int(request.get("page", 0)),
+            per_page=int(request.get("per_page", DEFAULT_PAGE_SIZE)),
+            sort=request.get("sort", "document"),
+            filters=request.get("filters"),
+        )
+
+    def run_batch_entry(self, request):
+        # 一括検索では不正なクエリがあっても他のクエリの結果は返す
+        try:
+            return self.run_query(request)
+        except (ValueError, TypeError) as error:
+            return {"error": str(error)}
+
+    def respond(self, compute):
+        try:
+            payload = compute()
+        except NotReadyError as error:
+            self.send_json(503, {"error": str(error), "status": self.server.engine.store.status()})
+        except (ValueError, TypeError) as error:
+            self.send_json(400, {"error": str(error)})
+        except Exception:
+            logging.exception("検索に失敗しました")
+            self.send_json(500, {"error": "検索に失敗しました"})
+        else:
+            self.send_json(200, payload)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, data_dir=DATA_DIR, index_path=INDEX_FILE, verbose=False):
+    """コーパスのウォームアップを始め、検索エンジンを載せたHTTPサーバーを作る"""
+    store = CorpusStore(data_dir, index_path, builders=SEARCH_BUILDERS)
+    store.start()
+    server = ThreadingHTTPServer((host, port), SearchRequestHandler)
+    server.daemon_threads = True
+    server.engine = SearchEngine(store, metrics=StageMetrics())
+    server.verbose = verbose
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="議事録の検索をローカルのHTTP JSON APIとして提供する")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="年度別JSONのデータディレクトリ")
+    parser.add_argument("--index", default=INDEX_FILE, help="build_index.py で作ったインデックスファイル")
+    parser.add_argument("-v", "--verbose", action="store_true", help="リクエストごとのログを出す")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = make_server(args.host, args.port, args.data_dir, args.index, args.verbose)
+    print(f"検索サービスを起動しました: http://{args.host}:{args.port}/search?q=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.engine.store.stop()
+
+if __name__ == "__main__":
+    main()
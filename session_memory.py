@@ -0,0 +1,76 @@
+import sys
+import threading
+import time
+
+# この秒数のあいだ再実行の無いセッションは集計から外す
+SESSION_TIMEOUT = 3600
+
+CONTAINERS = (dict, list, tuple, set, frozenset)
+
+def state_size(value, seen=None):
+    """セッション状態の値が保持するメモリ量の概算（バイト）
+
+    辞書・リスト・タプル・集合は要素までたどって合計する。それ以外のオブジェクト
+    （コーパスのビューなど）は共有データへの参照とみなし、オブジェクト自身の大きさだけ数える。
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += state_size(key, seen) + state_size(item, seen)
+    elif isinstance(value, CONTAINERS):
+        for item in value:
+            size += state_size(item, seen)
+    return size
+
+class SessionMemory:
+    """セッションごとのセッション状態の大きさを集計する（プロセス内で共有する）
+
+    各セッションが再実行の終わりに自分の状態を record() し、管理者用ビューで
+    一覧する。同時接続数に対するサーバーの見積もりに使う。
+    """
+
+    def __init__(self, timeout=SESSION_TIMEOUT):
+        self.timeout = timeout
+        # {セッションキー: (更新時刻, {キー: バイト数})}
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def record(self, session_key, state):
+        sizes = {key: state_size(value) for key, value in state.items()}
+        now = time.time()
+        with self.lock:
+            self.sessions[session_key] = (now, sizes)
+            for key in [key for key, (updated_at, _) in self.sessions.items() if now - updated_at > self.timeout]:
+                del self.sessions[key]
+
+    def snapshot(self):
+        """セッションごとのキー数・合計・最大のキーを大きい順に返す"""
+        with self.lock:
+            sessions = dict(self.sessions)
+        rows = []
+        for session_key, (updated_at, sizes) in sessions.items():
+            largest = max(sizes, key=sizes.get) if sizes else None
+            rows.append({
+                "session": session_key[:8],
+                "keys": len(sizes),
+                "bytes": sum(sizes.values()),
+                "largest_key": largest,
+                "largest_bytes": sizes.get(largest, 0),
+                "updated_at": time.strftime("%H:%M:%S", time.localtime(updated_at)),
+            })
+        return sorted(rows, key=lambda row: row["bytes"], reverse=True)
+
+    def summary(self):
+        """集計中のセッション数と状態の合計・平均・最大（バイト）"""
+        totals = [row["bytes"] for row in self.snapshot()]
+        return {
+            "sessions": len(totals),
+            "total_bytes": sum(totals),
+            "mean_bytes": sum(totals) // len(totals) if totals else 0,
+            "max_bytes": max(totals, default=0),
+        }
@@ -1,7 +1,15 @@
 import streamlit as st
-import json
+import time
 from datetime import datetime
 import re
+import uuid
+from cards import card_fragments, item_card, result_card
+from corpus import Corpus, data_version, file_stamp, load_manifest
+from corpus_store import SEARCH_BUILDERS, CorpusStore
+from facets import FACETS
+from metrics import StageMetrics
+from search_engine import QueryCache, SearchEngine
+from session_memory import SessionMemory
 
 def apply_tokyo_assembly_style():
     st.markdown("""
@@ -428,59 +436,174 @@ div[data-baseweb="select"] {
         </style>
     """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data(filepath):
-    with open(filepath, "r", encoding="utf-8") as file:
-        return json.load(file)
-
-def highlight_search_term(text, query):
-    """検索クエリをハイライト表示する"""
-    if not query:
-        return text
-    
-    # 複数キーワードの場合に分割
-    keywords = query.split()
-    highlighted_text = text
-    
-    for keyword in keywords:
-        if keyword.strip():  # 空のキーワードを除外
-            import re
-            highlighted_text = re.sub(
-                f"({re.escape(keyword)})", 
-                r'<span class="highlight">\1</span>', 
-                highlighted_text, 
-                flags=re.IGNORECASE
+RESULTS_PER_PAGE = 20
+# フリーワード検索の並び順（表示名 → 内部値）
+SORT_ORDERS = {"掲載順": "document", "関連度順": "relevance"}
+# 絞り込みの見出し
+FACET_LABELS = {"year": "年度", "meeting": "会議番号", "category": "カテゴリ", "cluster_keywords": "キーワード"}
+
+@st.cache_resource
+def get_corpus_store():
+    """プロセス内で1つだけのコーパスと検索用の派生物を返す入れ物
+
+    最初の実行で作られ、別スレッドでコーパスの読み込みと絞り込み・関連度の
+    構築（ウォームアップ）を始める。その後はデータファイルの変更を監視して差し替える。
+    """
+    store = CorpusStore(builders=SEARCH_BUILDERS)
+    store.start()
+    return store
+
+# ウォームアップの段階の表示名
+WARMUP_LABELS = {"corpus": "議事録データ", "facets": "絞り込み", "positions": "語句・近接検索", "ranker": "関連度順"}
+
+@st.fragment(run_every=1.0)
+def render_warmup_status():
+    """ウォームアップ中の準備状況を表示し、検索できるようになったら画面を描き直す"""
+    status = get_corpus_store().status()
+    if status["corpus"]:
+        st.rerun()
+    st.info("検索データを準備しています。準備ができると自動で結果を表示します。")
+    st.markdown(" / ".join(
+        f"{WARMUP_LABELS[name]} {'✅' if ready else '⏳'}" for name, ready in status.items()
+    ))
+
+@st.cache_resource(max_entries=1)
+def load_meeting_manifest(version):
+    """年度別JSONごとの会議ID一覧（マニフェスト）を返す（version はデータのバージョン印）"""
+    return load_manifest([filepath for filepath, _, _ in version])
+
+@st.cache_resource(max_entries=1)
+def load_meeting_files(version):
+    """会議ID → 年度別JSONのパス（同じ会議IDが複数の年度にあれば新しい年度を優先する）"""
+    meeting_files = {}
+    for filepath, meeting_ids in load_meeting_manifest(version).items():
+        for meeting_id in meeting_ids:
+            meeting_files.setdefault(meeting_id, filepath)
+    return meeting_files
+
+@st.cache_resource(max_entries=16)
+def load_year(filepath, stamp=None):
+    """キーワード検索用に1年度分だけのコーパスを構築する（転置インデックスは作らない）
+
+    stamp にはファイルの更新時刻とサイズを渡し、更新されたら読み直す。
+    """
+    version = None if stamp is None else ((filepath, *stamp),)
+    return Corpus.from_files((filepath,), version, searchable=False)
+
+def find_year_meeting(filepath, meeting_id):
+    """年度別コーパスから会議を引く（書き込み途中などで読み込めなければ注意を表示して None）"""
+    try:
+        # 読み込みに失敗した結果はキャッシュされないため、次の再実行で読み直す
+        year_corpus = load_year(filepath, file_stamp(filepath))
+    except ValueError:
+        st.warning(f"{filepath} を読み込めませんでした（更新中の可能性があります）。しばらくしてから再度お試しください。")
+        return None
+    return year_corpus.find_meeting(meeting_id)
+
+@st.cache_resource(max_entries=64)
+def cluster_card_fragments(_cluster, version, cluster_id):
+    """クラスタ内の項目のカードを連結したHTML断片（version と cluster_id で共有する）"""
+    return card_fragments([item_card(item) for item in _cluster.items])
+
+def resolve_keyword_query(search_query):
+    """キーワード検索の条件（会議ID・カテゴリ名・キーワード）を共有のコーパスから引き直す
+
+    セッションには条件だけを保存し、会議・カテゴリ・クラスタは描画のたびに
+    キャッシュ済みの年度別コーパスから引く（見つからなければ None）。
+    """
+    filepath = load_meeting_files(data_version()).get(search_query["meeting"])
+    if filepath is None:
+        return None, None, None
+    meeting = find_year_meeting(filepath, search_query["meeting"])
+    category = meeting.find_category(search_query["category"]) if meeting else None
+    cluster = category.find_cluster(search_query["keyword"]) if category else None
+    return meeting, category, cluster
+
+def update_facet_filter(facet):
+    """絞り込みの選択を保存し、1ページ目に戻す"""
+    st.session_state.facet_filters[facet] = st.session_state[f"facet_{facet}"]
+    st.session_state.result_page = 0
+
+def render_facet_filters(facet_counts):
+    """ファセットごとの複数選択を件数付きで表示する
+
+    件数が変わると選択肢の表示が変わりウィジェットが作り直されるため、
+    選択は facet_filters に保存しておき、default として渡し直す。
+    """
+    with st.expander("絞り込み", expanded=any(st.session_state.facet_filters.values())):
+        for facet in FACETS:
+            counts = facet_counts[facet]
+            selected = st.session_state.facet_filters.get(facet, [])
+            options = list(counts) if facet in ("year", "meeting") else sorted(counts, key=counts.get, reverse=True)
+            options += [value for value in selected if value not in counts]
+            st.multiselect(
+                FACET_LABELS[facet],
+                options,
+                default=selected,
+                key=f"facet_{facet}",
+                format_func=lambda value, counts=counts: f"{value} ({counts.get(value, 0)})",
+                on_change=update_facet_filter,
+                args=(facet,),
             )
-    
-    return highlighted_text
 
-def search_items(data, search_query):
-    results = []
-    
-    # 複数キーワードを分割
-    keywords = search_query.split()
-    
-    for meeting in data:
-        for category in meeting["categories"]:
-            for cluster in category["clusters"]:
-                for item in cluster["items"]:
-                    # すべてのキーワードが含まれているかチェック
-                    if all(keyword.lower() in item["body"].lower() for keyword in keywords if keyword.strip()):
-                        # ハイライト処理を追加
-                        highlighted_body = highlight_search_term(item["body"], search_query)
-                        highlighted_head = highlight_search_term(item["head"], search_query)
-                        
-                        results.append({
-                            "meeting_id": meeting["meeting_id"],
-                            "date": meeting.get("date", "記載なし"),
-                            "category": category["category"],
-                            "cluster_keywords": cluster["cluster_keywords"],
-                            "item": {
-                                "head": highlighted_head,
-                                "body": highlighted_body
-                            }
-                        })
-    return results
+@st.cache_resource
+def get_query_cache():
+    return QueryCache()
+
+@st.cache_resource
+def get_session_memory():
+    """プロセス内で共有するセッションごとの状態の大きさ"""
+    return SessionMemory()
+
+@st.cache_resource
+def get_metrics():
+    """プロセス内で共有する段階別の処理時間集計"""
+    return StageMetrics()
+
+def render_admin_panel():
+    """処理時間の集計を表示する管理者用ビュー（URLに ?admin=1 を付けると表示）"""
+    metrics = get_metrics()
+    st.markdown("## 処理時間メトリクス")
+    snapshot = metrics.snapshot()
+    if snapshot:
+        st.table([{"stage": stage, **values} for stage, values in snapshot.items()])
+    else:
+        st.info("まだ計測データがありません。")
+    st.markdown("### コーパス")
+    st.table([get_corpus_store().stats()])
+    st.markdown("### 検索結果キャッシュ")
+    st.table([
+        {"cache": "照合結果", **get_query_cache().stats()},
+        {"cache": "ページ単位の結果", **get_search_engine().result_cache.stats()},
+    ])
+    st.markdown("### セッションごとのメモリ")
+    session_memory = get_session_memory()
+    st.table([session_memory.summary()])
+    sessions = session_memory.snapshot()
+    if sessions:
+        st.dataframe(sessions)
+    st.download_button("JSONでダウンロード", metrics.to_json(), file_name="metrics.json", mime="application/json")
+
+@st.cache_resource
+def get_search_engine():
+    """プロセス内で共有する検索エンジン（search_server.py と同じ処理）"""
+    return SearchEngine(get_corpus_store(), get_query_cache(), get_metrics(), render_hit=result_card)
+
+def finish_rerun():
+    """再実行1回分の処理時間とセッション状態の大きさを記録する（末尾まで進んだ実行と途中で打ち切る実行の両方から呼ぶ）"""
+    metrics.record("rerun", time.perf_counter() - rerun_started)
+    if "session_key" in st.session_state:
+        get_session_memory().record(st.session_state.session_key, st.session_state.to_dict())
+
+def rerun():
+    """記録してから st.rerun() する（例外で打ち切られ、末尾の記録には届かないため）"""
+    finish_rerun()
+    st.rerun()
+
+def stop():
+    """記録してから st.stop() する"""
+    finish_rerun()
+    st.stop()
 
 # アプリケーションの設定
 st.set_page_config(
@@ -493,6 +616,18 @@ st.set_page_config(
 # スタイル適用
 apply_tokyo_assembly_style()
 
+# 処理時間の計測（再実行1回分の合計は末尾か rerun()/stop() で記録する）
+metrics = get_metrics()
+rerun_started = time.perf_counter()
+
+# プロセスで最初の実行時にウォームアップを始める（待たずに画面を描画する）
+get_corpus_store()
+
+# 管理者用ビュー
+if st.query_params.get("admin") == "1":
+    render_admin_panel()
+    stop()
+
 # セッション状態の初期化
 if 'show_search_panel' not in st.session_state:
     st.session_state.show_search_panel = True
@@ -500,19 +635,24 @@ if 'search_mode' not in st.session_state:
     st.session_state.search_mode = None  # デフォルトで何も選択されていない状態
 if 'search_query' not in st.session_state:
     st.session_state.search_query = None
-if 'meeting_data' not in st.session_state:
-    st.session_state.meeting_data = None
-if 'category_data' not in st.session_state:
-    st.session_state.category_data = None
+if 'session_key' not in st.session_state:
+    st.session_state.session_key = uuid.uuid4().hex
 if 'previous_inputs' not in st.session_state:
     st.session_state.previous_inputs = {
         "freeword": "",
         "meeting": "",
         "category": "",
-        "keyword": ""
+        "keyword": "",
+        "sort_order": "document"
     }
+if 'facet_filters' not in st.session_state:
+    st.session_state.facet_filters = {}
+if 'sort_order' not in st.session_state:
+    st.session_state.sort_order = "document"
 if 'scroll_to_top' not in st.session_state:
     st.session_state.scroll_to_top = False
+if 'result_page' not in st.session_state:
+    st.session_state.result_page = 0
 
 # 戻るボタン（常に一番上に表示）
 if not st.session_state.show_search_panel:
@@ -526,7 +666,7 @@ if not st.session_state.show_search_panel:
     if st.button("← 検索条件に戻る", key="back_button", type="secondary"):
         st.session_state.show_search_panel = True
         st.session_state.scroll_to_top = True
-        st.rerun()
+        rerun()
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 # 検索後に自動でページトップにスクロール
@@ -578,7 +718,7 @@ if st.session_state.show_search_panel:
                 type="primary" if st.session_state.search_mode == "keyword" else "secondary"
             ):
                 st.session_state.search_mode = "keyword"
-                st.rerun()
+                rerun()
 
         with col2:
             # フリーワード検索ボタン
@@ -589,7 +729,7 @@ if st.session_state.show_search_panel:
                 type="primary" if st.session_state.search_mode == "freeword" else "secondary"
             ):
                 st.session_state.search_mode = "freeword"
-                st.rerun()
+                rerun()
         st.markdown('</div>', unsafe_allow_html=True)
         
         # 検索モードが選択されていない場合は案内メッセージを表示
@@ -619,17 +759,12 @@ if st.session_state.show_search_panel:
                 # キーワード検索の見出し
                 st.markdown('<div class="icon-label"><span class="search-icon">🏷️</span>キーワード検索</div>', unsafe_allow_html=True)
                 
-                # データ読み込み
-                data = []
-                for n in range(10):
-                    try:
-                        data += load_data(f"output_test/{2024-n}.json")
-                    except FileNotFoundError:
-                        st.error(f"データファイル output_test/{2024-n}.json が見つかりません")
-                        continue
+                # 会議IDの一覧だけをマニフェストから読み込む（年度別JSON本体は選択後に読む）
+                with metrics.timed("load_manifest"):
+                    meeting_files = load_meeting_files(data_version())
                 
                 # 会議選択 - 前回の入力を保持
-                meeting_options = [meeting["meeting_id"] for meeting in data]
+                meeting_options = list(meeting_files)
                 selected_meeting = st.selectbox(
                     "会議番号選択", 
                     meeting_options, 
@@ -638,12 +773,15 @@ if st.session_state.show_search_panel:
                     if st.session_state.previous_inputs["meeting"] in meeting_options else 0
                 )
                 
-                # 選択された会議のデータを取得
-                meeting_data = next((m for m in data if m["meeting_id"] == selected_meeting), None)
+                # 選択された会議の年度だけを読み込み、辞書索引で引く
+                meeting_data = None
+                if selected_meeting in meeting_files:
+                    with metrics.timed("load_year"):
+                        meeting_data = find_year_meeting(meeting_files[selected_meeting], selected_meeting)
                 
                 if meeting_data:
                     # カテゴリ選択 - 前回の入力を保持
-                    categories = [c["category"] for c in meeting_data["categories"]]
+                    categories = [c.name for c in meeting_data.categories]
                     selected_category = st.selectbox(
                         "カテゴリ選択", 
                         categories, 
@@ -652,11 +790,11 @@ if st.session_state.show_search_panel:
                         if st.session_state.previous_inputs["category"] in categories else 0
                     )
                     
-                    category_data = next((c for c in meeting_data["categories"] if c["category"] == selected_category), None)
+                    category_data = meeting_data.find_category(selected_category)
                     
                     if category_data:
                         # キーワード選択 - 前回の入力を保持
-                        cluster_keywords = [cl["cluster_keywords"] for cl in category_data["clusters"]]
+                        cluster_keywords = [cl.keywords for cl in category_data.clusters]
                         selected_cluster_keywords = st.selectbox(
                             "キーワード選択", 
                             cluster_keywords, 
@@ -684,10 +822,8 @@ if st.session_state.show_search_panel:
                                 "category": selected_category,
                                 "keyword": selected_cluster_keywords
                             }
-                            st.session_state.meeting_data = meeting_data
-                            st.session_state.category_data = category_data
                             st.session_state.scroll_to_top = True
-                            st.rerun()
+                            rerun()
             
             elif st.session_state.search_mode == "freeword":
                 # フリーワード検索
@@ -700,6 +836,15 @@ if st.session_state.show_search_panel:
                     key="freeword_search",
                     value=st.session_state.previous_inputs["freeword"]
                 )
+                st.caption('"待機 児童" のように引用符で囲むと続けて現れる語句（待機児童）を、「保育 ~10 待機」で10文字以内に両方を含む項目を検索します')
+                sort_labels = list(SORT_ORDERS)
+                sort_label = st.radio(
+                    "並び順",
+                    sort_labels,
+                    key="sort_order_select",
+                    horizontal=True,
+                    index=list(SORT_ORDERS.values()).index(st.session_state.previous_inputs["sort_order"])
+                )
                 
                 # 検索ボタンを中央に配置
                 st.markdown('<div class="search-button-container">', unsafe_allow_html=True)
@@ -710,11 +855,15 @@ if st.session_state.show_search_panel:
                 if search_clicked and freeword_search:
                     # 前回の入力を保存
                     st.session_state.previous_inputs["freeword"] = freeword_search
+                    st.session_state.previous_inputs["sort_order"] = SORT_ORDERS[sort_label]
                     
                     st.session_state.show_search_panel = False
                     st.session_state.search_query = freeword_search
+                    st.session_state.sort_order = SORT_ORDERS[sort_label]
+                    st.session_state.facet_filters = {}
+                    st.session_state.result_page = 0
                     st.session_state.scroll_to_top = True
-                    st.rerun()
+                    rerun()
                 elif search_clicked and not freeword_search:
                     st.warning("検索キーワードを入力してください")
         
@@ -733,17 +882,27 @@ elif not st.session_state.show_search_panel:
         """, unsafe_allow_html=True)
         st.session_state.scroll_to_top = False
     
-    if st.session_state.search_mode == "freeword":
-        # フリーワード検索結果を表示
-        search_data = []
-        for n in range(10):
-            try:
-                search_data += load_data(f"output_test/{2024-n}.json")
-            except FileNotFoundError:
-                st.error(f"データファイル output_test/{2024-n}.json が見つかりません")
-                continue
-        
-        search_results = search_items(search_data, st.session_state.search_query)
+    if st.session_state.search_mode == "freeword" and get_corpus_store().snapshot() is None:
+        # ウォームアップが終わるまでは待たせずに準備状況を表示する
+        render_warmup_status()
+
+    elif st.session_state.search_mode == "freeword":
+        # フリーワード検索結果を表示（コーパスと派生物は同じバージョンの組を使う）
+        # 照合・絞り込み・並べ替え・ハイライトは検索エンジンで表示中のページ分だけ行う
+        search_result = get_search_engine().search(
+            st.session_state.search_query,
+            page=st.session_state.result_page,
+            per_page=RESULTS_PER_PAGE,
+            sort=st.session_state.sort_order,
+            filters=st.session_state.facet_filters,
+        )
+        total_count = search_result["total"]
+        page = search_result["page"]
+        page_count = search_result["page_count"]
+        filtered_badge = (
+            f'<span class="result-badge" style="font-size:1.3rem;">絞り込み: {search_result["count"]}件</span>'
+            if search_result["count"] != total_count else ""
+        )
         
         st.markdown(f"""
         <div style="background-color: var(--secondary-color); padding: 1.6rem; border-radius: 12px; margin-bottom: 2rem; max-width: 700px; margin-left: auto; margin-right: auto;">
@@ -751,50 +910,55 @@ elif not st.session_state.show_search_panel:
             <div style="display: flex; align-items: center; justify-content: center; gap: 1rem; flex-wrap: wrap; font-size: 1.3rem; margin-top: 0.8rem;">
                 <div style="font-weight: bold; color: var(--primary-color);">検索クエリ:</div>
                 <div style="font-weight: 600;">"{st.session_state.search_query}"</div>
-                <span class="result-badge" style="font-size:1.3rem;">検索結果: {len(search_results)}件</span>
+                <span class="result-badge" style="font-size:1.3rem;">検索結果: {total_count}件</span>
+                {filtered_badge}
             </div>
         </div>
         """, unsafe_allow_html=True)
+        if total_count and search_result["facets"] is not None:
+            render_facet_filters(search_result["facets"])
 
         
-        if search_results:
-            for result in search_results:
-                st.markdown(f"""
-                    <div class="meeting-item">
-                        <div style="margin-bottom: 0.8rem; text-align: center; font-size: 1rem;">
-                            <span class="tokyo-badge">会議番号</span>
-                            <span style="font-weight: 600;">{result['meeting_id']}</span>
-                            <span class="tokyo-badge">開催日</span>
-                            <span style="font-weight: 600;">{result['date']}</span>
-                        </div>
-                        <div style="margin-bottom: 0.8rem; text-align: center; font-size: 1rem;">
-                            <span class="tokyo-badge">カテゴリ</span>
-                            <span style="font-weight: 600;">{result['category']}</span>
-                            <span class="tokyo-badge">キーワード</span>
-                            <span style="font-weight: 600;">{result['cluster_keywords']}</span>
-                        </div>
-                        <div class="meeting-item-head">📌 {result['item']['head']}</div>
-                        <div class="meeting-item-body">{result['item']['body']}</div>
-                    </div>
-                """, unsafe_allow_html=True)
+        if search_result["hits"]:
+            if search_result["sort"] != st.session_state.sort_order:
+                st.info("関連度順は準備中のため、掲載順で表示しています。")
+            page_results = search_result["hits"]
+            
+            render_started = time.perf_counter()
+            # カードはページ単位の結果と一緒にキャッシュされており、連結して一度に描画する
+            for fragment in card_fragments([result["card"] for result in page_results]):
+                st.markdown(fragment, unsafe_allow_html=True)
+            metrics.record("render", time.perf_counter() - render_started)
+            
+            # ページ送り
+            if page_count > 1:
+                col_prev, col_page, col_next = st.columns([1, 2, 1])
+                with col_prev:
+                    if st.button("← 前へ", key="prev_page", use_container_width=True, disabled=page == 0):
+                        st.session_state.result_page = page - 1
+                        st.session_state.scroll_to_top = True
+                        rerun()
+                with col_page:
+                    st.markdown(
+                        f'<div style="text-align: center; padding-top: 0.4rem;">{page + 1} / {page_count} ページ</div>',
+                        unsafe_allow_html=True
+                    )
+                with col_next:
+                    if st.button("次へ →", key="next_page", use_container_width=True, disabled=page >= page_count - 1):
+                        st.session_state.result_page = page + 1
+                        st.session_state.scroll_to_top = True
+                        rerun()
         else:
             st.warning("該当する議事内容が見つかりませんでした。")
             
     elif st.session_state.search_mode == "keyword":
-        # キーワード検索結果を表示
-        meeting_data = st.session_state.meeting_data
-        category_data = st.session_state.category_data
+        # キーワード検索結果を表示（セッションには条件だけがあり、コーパスから引き直す）
         search_query = st.session_state.search_query
+        meeting_data, category_data, selected_cluster = resolve_keyword_query(search_query)
 
         if meeting_data and category_data:
-            # selected_cluster をここで定義
-            selected_cluster = next(
-                (cl for cl in category_data["clusters"] if cl["cluster_keywords"] == search_query["keyword"]),
-                None
-            )
-            
             if selected_cluster:
-                result_count = len(selected_cluster["items"])
+                result_count = len(selected_cluster.items)
                 st.markdown(f"""
                 <div style="background-color: var(--secondary-color); padding: 1.8rem; border-radius: 12px; margin-bottom: 2rem; max-width: 650px; margin-left: auto; margin-right: auto;">
                 <h3 style="margin-top: 0; color: var(--primary-color); font-size: 1.9rem; text-align: center;">キーワード検索結果</h3>
@@ -802,7 +966,7 @@ elif not st.session_state.show_search_panel:
                     <!-- 会議番号 -->
                     <div style="display: flex; align-items: center; gap: 1.5rem;">
                     <span class="tokyo-badge" style="font-size: 1.1rem;">会議番号</span>
-                    <span style="font-size: 1.3rem; font-weight: 700; color: var(--primary-color);">{meeting_data['meeting_id']}</span>
+                    <span style="font-size: 1.3rem; font-weight: 700; color: var(--primary-color);">{meeting_data.meeting_id}</span>
                     </div>
                     <!-- カテゴリ（左寄せ） -->
                     <div style="display: flex; align-items: center; gap: 1.5rem; justify-content: flex-start;">
@@ -821,13 +985,10 @@ elif not st.session_state.show_search_panel:
 
                 
                 st.markdown("### 議事内容")
-                for item in selected_cluster["items"]:
-                    st.markdown(f"""
-                        <div class="meeting-item">
-                            <div class="meeting-item-head">📌 {item['head']}</div>
-                            <div class="meeting-item-body">{item['body']}</div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                with metrics.timed("render"):
+                    fragments = cluster_card_fragments(selected_cluster, selected_cluster.corpus.version, selected_cluster.id)
+                    for fragment in fragments:
+                        st.markdown(fragment, unsafe_allow_html=True)
             else:
                 st.error("選択されたクラスタが見つかりません。")
         else:
@@ -839,3 +1000,5 @@ st.markdown("""
         <p>© 2025 行政文書ビューア(仮) | このシステムは行政文書の議事録を閲覧するためのものです</p>
     </div>
 """, unsafe_allow_html=True)
+
+finish_rerun()
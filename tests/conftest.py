@@ -0,0 +1,55 @@
+import json
+import random
+
+import pytest
+
+from corpus import Corpus
+
+# 照合・ハイライトの確かめに使う語（全角英字・半角カナ・濁点付きの半角カナを含む）
+WORDS = (
+    "東京", "都", "区", "市", "保育", "待機", "児童", "待機児童", "子ども", "家庭",
+    "防災", "地震", "対策", "ＡＩ", "ai", "ｶﾞｲﾄﾞ", "ガイド", "①", "の", "に", "を", "、", "。",
+)
+
+def make_meetings(seed=0, meeting_ids=("2021-1", "2020-2", "2020-1")):
+    """年度別JSONと同じ形の会議データを乱数で作る"""
+    rng = random.Random(seed)
+    meetings = []
+    for meeting_no, meeting_id in enumerate(meeting_ids):
+        categories = []
+        for category in ("教育・子育て", "防災・まちづくり")[:rng.randint(1, 2)]:
+            clusters = []
+            for cluster_no in range(rng.randint(1, 3)):
+                items = [
+                    {
+                        "head": "".join(rng.choices(WORDS, k=rng.randint(1, 4))),
+                        "body": "".join(rng.choices(WORDS, k=rng.randint(5, 40))),
+                    }
+                    for _ in range(rng.randint(1, 6))
+                ]
+                clusters.append({"cluster_keywords": f"{category}・{cluster_no}", "items": items})
+            categories.append({"category": category, "clusters": clusters})
+        meeting = {"meeting_id": meeting_id, "categories": categories}
+        if meeting_no != 1:
+            meeting["date"] = f"令和{meeting_no + 2}年{meeting_no + 3}月1日"
+        meetings.append(meeting)
+    return meetings
+
+@pytest.fixture(scope="session")
+def meetings():
+    return make_meetings()
+
+@pytest.fixture(scope="session")
+def corpus(meetings):
+    return Corpus.from_data(meetings)
+
+def write_data_dir(path):
+    """年度別JSON（2021.json と 2020.json）を path に置く"""
+    years = {"2021": make_meetings(1, ("2021-1", "2021-2")), "2020": make_meetings(2, ("2020-1", "2020-2"))}
+    for year, data in years.items():
+        (path / f"{year}.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+@pytest.fixture
+def data_dir(tmp_path):
+    return write_data_dir(tmp_path)
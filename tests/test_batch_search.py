@@ -0,0 +1,30 @@
+import io
+import json
+
+import batch_search
+from search_engine import match_items
+
+def test_read_queries_skips_invalid_lines():
+    lines = [
+        {"id": "a", "query": "東京"},
+        "保育",
+        {"request_id": "x", "title": "クエリの無い行"},
+        {"query": 3},
+        {"query": "  "},
+        5,
+        ["東京"],
+        "{壊れた行",
+        "",
+        {"query": "待機"},
+    ]
+    source = io.StringIO("\n".join(line if line in ("", "{壊れた行") else json.dumps(line, ensure_ascii=False) for line in lines))
+    errors = io.StringIO()
+    assert list(batch_search.read_queries(source, errors=errors)) == [("a", "東京"), (2, "保育"), (10, "待機")]
+    assert [line.split("行目")[0] for line in errors.getvalue().splitlines()] == ["3", "4", "5", "6", "7", "8"]
+
+def test_run_query_limits_hits(corpus, monkeypatch):
+    monkeypatch.setattr(batch_search, "_corpus", corpus)
+    result = batch_search.run_query(("q", "の", batch_search.DEFAULT_LIMIT))
+    assert result["count"] == len(match_items(corpus, "の")) > batch_search.DEFAULT_LIMIT
+    assert [hit["item_id"] for hit in result["hits"]] == match_items(corpus, "の")[:batch_search.DEFAULT_LIMIT]
+    assert batch_search.run_query(("q", "の", 0))["hits"] == []
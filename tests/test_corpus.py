@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from conftest import make_meetings
+from corpus import INDEX_HEADER, Corpus, TextColumn, discover_data_files, duplicate_meeting_ids, load_manifest
+from corpus_store import CorpusStore
+
+COLUMNS = (
+    "strings", "meeting_ids", "meeting_dates", "meeting_files", "meeting_categories",
+    "category_meeting", "category_names", "category_clusters",
+    "cluster_category", "cluster_keywords", "cluster_items",
+    "item_meeting", "item_category", "item_cluster",
+    "item_heads", "item_bodies", "item_heads_normalized", "item_bodies_normalized",
+    "missing_files", "source_files", "version",
+)
+
+def assert_same_corpus(actual, expected):
+    for name in COLUMNS:
+        actual_column, expected_column = getattr(actual, name), getattr(expected, name)
+        if expected_column is None:
+            assert actual_column is None, name
+        else:
+            assert list(actual_column) == list(expected_column), name
+    assert dict(actual.item_head_offset_maps) == dict(expected.item_head_offset_maps)
+    assert dict(actual.item_body_offset_maps) == dict(expected.item_body_offset_maps)
+    assert sorted(actual.postings) == sorted(expected.postings)
+    for gram in expected.postings:
+        assert list(actual.postings[gram]) == list(expected.postings[gram]), gram
+    assert (actual.meeting_lookup, actual.category_lookup, actual.cluster_lookup) == (
+        expected.meeting_lookup, expected.category_lookup, expected.cluster_lookup
+    )
+
+def test_index_round_trip(meetings, tmp_path):
+    corpus = Corpus.from_data(meetings, source_files=("a.json",), version=(("a.json", 1, 2),))
+    index_path = tmp_path / "corpus.idx"
+    corpus.write_index(str(index_path))
+    mapped = Corpus.from_index(str(index_path))
+    assert_same_corpus(mapped, corpus)
+    for item_id in range(len(corpus)):
+        assert mapped.item_bodies_normalized.contains(item_id, corpus.item_bodies_normalized[item_id][-2:])
+    assert mapped.find_candidates(["待機児童"]) == corpus.find_candidates(["待機児童"])
+
+def test_merge_matches_single_build(meetings):
+    whole = Corpus.from_data(meetings)
+    parts = [Corpus.from_data(meetings[:1]), Corpus.from_data(meetings[1:])]
+    assert_same_corpus(Corpus.merge(parts), whole)
+
+def test_text_column():
+    column = TextColumn(["東京", "", "待機児童"])
+    assert list(column) == ["東京", "", "待機児童"]
+    assert column.contains(2, "児童") and not column.contains(0, "児童")
+
+@pytest.mark.parametrize("size", [0, 10, INDEX_HEADER.size + 3, -5])
+def test_truncated_index_is_value_error(meetings, tmp_path, size):
+    index_path = tmp_path / "corpus.idx"
+    Corpus.from_data(meetings).write_index(str(index_path))
+    data = index_path.read_bytes()
+    index_path.write_bytes(data[:size])
+    with pytest.raises(ValueError):
+        Corpus.from_index(str(index_path))
+
+def test_store_falls_back_to_json_when_index_is_broken(data_dir):
+    index_path = data_dir / "corpus.idx"
+    index_path.write_bytes(b"TKYMIDX1" + b"\0" * 7)
+    store = CorpusStore(str(data_dir), str(index_path))
+    store.warm_up()
+    assert store.error is None
+    assert len(store.current()) > 0
+
+def test_empty_year_is_loaded(meetings, tmp_path):
+    (tmp_path / "2022.json").write_text("[]", encoding="utf-8")
+    store = CorpusStore(str(tmp_path), str(tmp_path / "missing.idx"))
+    store.warm_up()
+    assert store.error is None
+    assert store.current() is not None and len(store.current()) == 0
+    assert (store.stats()["files"], store.stats()["items"]) == (1, 0)
+    assert_same_corpus(Corpus.merge([Corpus.from_data([]), Corpus.from_data(meetings)]), Corpus.from_data(meetings))
+
+def test_duplicate_meeting_ids_are_reported(tmp_path, caplog):
+    for year, meeting_ids in (("2015", ("2015-1", "2015-2")), ("2014", ("2015-1",))):
+        data = make_meetings(int(year), meeting_ids)
+        (tmp_path / f"{year}.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    files = discover_data_files(str(tmp_path))
+    manifest = load_manifest(files, str(tmp_path / "meetings.manifest"))
+    assert duplicate_meeting_ids(manifest) == {"2015-1": files}
+    assert "2015-1" in caplog.text
+
+    corpus = Corpus.from_files(files)
+    assert corpus.duplicate_meetings() == ("2015-1",)
+    assert corpus.find_meeting("2015-1").id == 0
+    assert Corpus.from_files(files[:1]).duplicate_meetings() == ()
+
+def test_manifest_tolerates_year_file_mid_write(tmp_path, caplog):
+    for year, meeting_ids in (("2021", ("2021-1",)), ("2020", ("2020-1", "2020-2"))):
+        (tmp_path / f"{year}.json").write_text(json.dumps(make_meetings(0, meeting_ids), ensure_ascii=False), encoding="utf-8")
+    files = discover_data_files(str(tmp_path))
+    manifest_path = str(tmp_path / "meetings.manifest")
+    assert load_manifest(files, manifest_path)[files[1]] == ("2020-1", "2020-2")
+
+    # 書き込み途中の年度は前回の一覧を使い、初めて見る年度なら飛ばす
+    (tmp_path / "2020.json").write_text('[{"meeting_id": "2020-1", "categ', encoding="utf-8")
+    (tmp_path / "2022.json").write_text("[", encoding="utf-8")
+    files = discover_data_files(str(tmp_path))
+    manifest = load_manifest(files, manifest_path)
+    assert manifest == {files[1]: ("2021-1",), files[2]: ("2020-1", "2020-2")}
+    assert "2022.json" in caplog.text
+
+    # 書き終われば読み直す
+    (tmp_path / "2020.json").write_text(json.dumps(make_meetings(0, ("2020-3",))), encoding="utf-8")
+    assert load_manifest(files, manifest_path)[files[2]] == ("2020-3",)
@@ -0,0 +1,67 @@
+import json
+import random
+
+import pytest
+
+from conftest import make_meetings
+from corpus import Corpus, discover_data_files
+from facets import FACETS, FacetIndex, bitset_ids, meeting_year, to_bitset
+
+@pytest.fixture(scope="module")
+def facets(corpus):
+    return FacetIndex.from_corpus(corpus)
+
+def item_values(corpus, item_id):
+    """項目のファセット値を {ファセット: 値} で直接たどって求める"""
+    item = corpus.item(item_id)
+    return {
+        "year": meeting_year(item.meeting),
+        "meeting": item.meeting.meeting_id,
+        "category": item.category.name,
+        "cluster_keywords": item.cluster.keywords,
+    }
+
+def selected(values, selections, skip=None):
+    return all(values[facet] in selections[facet] for facet in selections if facet != skip and selections[facet])
+
+def test_bitset_round_trip():
+    item_ids = [0, 3, 7, 8, 64, 1000]
+    assert bitset_ids(to_bitset(item_ids)) == item_ids
+    assert to_bitset([]) == 0 and bitset_ids(0) == []
+
+@pytest.mark.parametrize("seed", range(20))
+def test_counts_and_apply_match_brute_force(corpus, facets, seed):
+    rng = random.Random(seed)
+    values = [item_values(corpus, item_id) for item_id in range(len(corpus))]
+    result = sorted(rng.sample(range(len(corpus)), rng.randint(0, len(corpus))))
+    selections = {}
+    for facet in rng.sample(FACETS, rng.randint(0, len(FACETS))):
+        choices = sorted({value[facet] for value in values})
+        selections[facet] = rng.sample(choices, rng.randint(0, min(2, len(choices))))
+
+    expected_counts = {}
+    for facet in FACETS:
+        counts = {}
+        for item_id in result:
+            if selected(values[item_id], selections, skip=facet):
+                counts[values[item_id][facet]] = counts.get(values[item_id][facet], 0) + 1
+        expected_counts[facet] = counts
+    assert facets.counts(to_bitset(result), selections) == expected_counts
+    assert bitset_ids(facets.apply(to_bitset(result), selections)) == [
+        item_id for item_id in result if selected(values[item_id], selections)
+    ]
+
+def test_year_comes_from_source_file(tmp_path):
+    # 2014.json の会議が 2015-1 という会議IDを使っていても 2014 年度に数える
+    for year, meeting_ids in (("2015", ("2015-1", "2015-2")), ("2014", ("2015-1",))):
+        data = make_meetings(int(year), meeting_ids)
+        (tmp_path / f"{year}.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    files = discover_data_files(str(tmp_path))
+    whole = Corpus.from_files(files)
+    merged = Corpus.merge([Corpus.from_files(files[:1]), Corpus.from_files(files[1:])])
+    for corpus in (whole, merged):
+        years = FacetIndex.from_corpus(corpus).bitsets["year"]
+        assert list(years) == ["2015", "2014"]
+        assert bitset_ids(years["2014"]) == [
+            item_id for item_id in range(len(corpus)) if corpus.item(item_id).meeting.source_file == files[1]
+        ]
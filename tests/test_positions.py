@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from positions import PositionalIndex
+from search_engine import find_occurrences, match_items, parse_query
+
+@pytest.fixture(scope="module")
+def positions(corpus):
+    return PositionalIndex.from_corpus(corpus)
+
+def scan(corpus, terms, proximities):
+    """str.find で本文を1件ずつ確かめる（照合結果の基準）"""
+    result = []
+    for item_id, body in enumerate(corpus.item_bodies_normalized):
+        if not all(body.find(term) != -1 for term in terms):
+            continue
+        if all(
+            any(
+                -len(b) - distance <= b_start - a_start <= len(a) + distance
+                for a_start in find_occurrences(body, a) for b_start in find_occurrences(body, b)
+            )
+            for a, b, distance in proximities
+        ):
+            result.append(item_id)
+    return result
+
+def sample_queries(corpus):
+    rng = random.Random(0)
+    bodies = list(corpus.item_bodies_normalized)
+    queries = ['"待機 児童"', '"待機児童"', '"ガイド"', '"東京都"', "保育 ~3 待機", "東京 ~0 都", "の ~1 に", "都 ~5 区 ~2 市"]
+    for _ in range(100):
+        body = rng.choice(bodies)
+        start = rng.randrange(len(body) - 1)
+        queries.append('"%s"' % body[start:start + rng.randint(2, 8)])
+        words = [body[start:start + 2], rng.choice(bodies)[:rng.randint(1, 3)]]
+        queries.append(f"{words[0]} ~{rng.randint(0, 20)} {words[1]}")
+    return queries
+
+def test_parse_query():
+    assert parse_query('東京 "待機 児童" 保育 ~10 ＡＩ ~3') == (
+        ["東京", "待機児童", "保育", "ai"], [("保育", "ai", 10)]
+    )
+    # 先頭の ~N は語として扱う
+    assert parse_query("~3 都") == (["~3", "都"], [])
+
+def test_gram_positions_skip_table(corpus, positions):
+    for gram in ("東京", "待機", "の、", "ai"):
+        everything = {item_id: list(found) for item_id, found in positions.gram_positions(gram).items()}
+        assert everything == {
+            item_id: find_occurrences(body, gram)
+            for item_id, body in enumerate(corpus.item_bodies_normalized) if gram in body
+        }
+        subset = set(list(everything)[::3]) | {len(corpus) + 5}
+        found = positions.gram_positions(gram, subset)
+        assert {item_id: list(offsets) for item_id, offsets in found.items()} == {
+            item_id: everything[item_id] for item_id in subset if item_id in everything
+        }
+
+def test_phrase_and_proximity_match_scan(corpus, positions):
+    matched = 0
+    for query in sample_queries(corpus):
+        expected = scan(corpus, *parse_query(query))
+        assert match_items(corpus, query, positions) == expected, query
+        assert match_items(corpus, query) == expected, query
+        matched += bool(expected)
+    # 一致する項目のあるクエリが十分に含まれていること
+    assert matched > 100
+
+def test_quoted_phrase_ignores_spaces(corpus, positions):
+    assert match_items(corpus, '"待機 児童"', positions) == match_items(corpus, "待機児童", positions) != []
@@ -0,0 +1,52 @@
+import math
+from collections import Counter
+
+import pytest
+
+from ranking import BM25_B, BM25_K1, BM25Index, index_terms
+from search_engine import match_items
+from token_cache import TokenCache
+
+@pytest.fixture(scope="module")
+def token_cache(tmp_path_factory):
+    return TokenCache(str(tmp_path_factory.mktemp("tokens")))
+
+@pytest.fixture(scope="module")
+def ranker(corpus, token_cache):
+    return BM25Index.from_corpus(corpus, token_cache)
+
+def brute_force_scores(corpus, token_cache, query_terms):
+    """BM25の定義どおりに全項目のスコアを求める"""
+    documents = [
+        Counter(index_terms(token_cache.tokenize(corpus.item_heads[item_id]))
+                + index_terms(token_cache.tokenize(corpus.item_bodies[item_id])))
+        for item_id in range(len(corpus))
+    ]
+    lengths = [sum(document.values()) for document in documents]
+    average_length = sum(lengths) / len(lengths)
+    scores = [0.0] * len(documents)
+    for term in query_terms:
+        frequency = sum(1 for document in documents if term in document)
+        if not frequency:
+            continue
+        idf = math.log(1 + (len(documents) - frequency + 0.5) / (frequency + 0.5))
+        for item_id, document in enumerate(documents):
+            tf = document.get(term, 0)
+            if tf:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[item_id] / average_length)
+                scores[item_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return scores
+
+@pytest.mark.parametrize("query", ["東京", "保育 待機", "防災 地震 対策", "子ども の 家庭", "ＡＩ ｶﾞｲﾄﾞ"])
+def test_top_k_matches_brute_force(corpus, ranker, token_cache, query):
+    scores = brute_force_scores(corpus, token_cache, ranker.query_terms(query, token_cache))
+    item_ids = match_items(corpus, query.split()[0])
+    expected = sorted(item_ids, key=lambda item_id: (-scores[item_id], item_id))
+    for k in (1, 5, len(item_ids)):
+        assert ranker.top_k(item_ids, query, k) == expected[:k]
+
+def test_query_tokens_are_not_stored(ranker, token_cache):
+    records = len(token_cache.records)
+    ranker.query_terms("まだ解析していないクエリ 東京都議会", token_cache)
+    assert len(token_cache.records) == records
+    assert all(digest in token_cache.records for digest in token_cache.pending)
@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+from conftest import make_meetings
+from corpus import Corpus, normalize_text
+from search_engine import build_result, highlight_normalized, highlight_search_term, parse_query
+
+HIGHLIGHT = re.compile(r'<span class="highlight">(.*?)</span>')
+
+def brute_force_matches(normalized, keywords):
+    """正規化済みの文字列を先頭から1文字ずつ調べ、長いキーワードを優先して重ならない一致を集める"""
+    keywords = sorted(set(keywords), key=len, reverse=True)
+    matches = []
+    position = 0
+    while position < len(normalized):
+        for keyword in keywords:
+            if normalized.startswith(keyword, position):
+                matches.append(keyword)
+                position += len(keyword)
+                break
+        else:
+            position += 1
+    return matches
+
+@pytest.mark.parametrize("query", ["ＡＩ", "ai", "ｶﾞｲﾄﾞ ガイド", "待機 待機児童", '"待機 児童"', "東京 都", "1", "保育 ~5 児童"])
+def test_highlight_matches_brute_force(corpus, query):
+    keywords = parse_query(query)[0]
+    for item_id in range(len(corpus)):
+        body = corpus.item_bodies[item_id]
+        highlighted = highlight_normalized(
+            body, corpus.item_bodies_normalized[item_id], corpus.item_body_offset_maps.get(item_id), query
+        )
+        assert highlight_search_term(body, query) == highlighted
+        # タグを外すと元の本文に戻り、ハイライトした部分を正規化すると一致した語の並びになる
+        assert HIGHLIGHT.sub(r"\1", highlighted) == body
+        segments = [normalize_text(segment) for segment in HIGHLIGHT.findall(highlighted)]
+        assert segments == brute_force_matches(normalize_text(body), keywords)
+
+def test_build_result_keeps_original_date_semantics():
+    meetings = make_meetings(3)
+    meetings[0]["date"] = ""
+    corpus = Corpus.from_data(meetings)
+    dates = {}
+    for item_id in range(len(corpus)):
+        hit = build_result(corpus, item_id, "")
+        dates[hit["meeting_id"]] = hit["date"]
+    # 元の meeting.get("date", "記載なし") と同じく、空文字列はそのまま、欠けた日付だけ「記載なし」
+    assert dates == {meeting["meeting_id"]: meeting.get("date", "記載なし") for meeting in meetings}
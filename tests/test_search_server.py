@@ -0,0 +1,101 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from corpus_store import CorpusStore
+from facets import FacetIndex
+from positions import PositionalIndex
+from search_engine import SearchEngine
+from search_server import SearchRequestHandler
+
+from conftest import write_data_dir
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    data_dir = write_data_dir(tmp_path_factory.mktemp("data"))
+    store = CorpusStore(str(data_dir), str(data_dir / "missing.idx"), builders={
+        "facets": FacetIndex.from_corpus,
+        "positions": PositionalIndex.from_corpus,
+    })
+    store.warm_up()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SearchRequestHandler)
+    server.daemon_threads = True
+    server.engine = SearchEngine(store)
+    server.verbose = False
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+def test_search(server):
+    status, payload = request(server, "GET", "/search?q=%E6%9D%B1%E4%BA%AC&per_page=2")
+    assert status == 200
+    assert payload["total"] > 0 and len(payload["hits"]) <= 2 and payload["sort"] == "document"
+
+@pytest.mark.parametrize("path", ["/search", "/search?q=", "/search?q=%20%20", "/search?q=x&page=a", "/search?q=x&sort=best"])
+def test_invalid_get_is_json_400(server, path):
+    status, payload = request(server, "GET", path)
+    assert status == 400 and "error" in payload
+
+@pytest.mark.parametrize("body", [
+    {"query": ""},
+    {"query": "東京", "filters": ["2020"]},
+    {"query": "東京", "filters": {"year": 2020}},
+    {"query": "東京", "filters": {"unknown": ["x"]}},
+    {"query": 3},
+])
+def test_invalid_post_is_json_400(server, body):
+    status, payload = request(server, "POST", "/search", json.dumps(body))
+    assert status == 400 and "error" in payload
+
+def test_batch_reports_errors_per_entry(server):
+    body = {"queries": [{"query": "東京"}, {"query": "東京", "filters": "2020"}, {"query": " "}]}
+    status, payload = request(server, "POST", "/search", json.dumps(body))
+    assert status == 200
+    assert "hits" in payload["results"][0]
+    assert [set(result) for result in payload["results"][1:]] == [{"error"}, {"error"}]
+
+def test_bad_content_length_is_json_400(server):
+    status, payload = request(server, "POST", "/search", b"{}", {"Content-Length": "abc"})
+    assert status == 400 and "error" in payload
+
+@pytest.mark.parametrize("method, path, body", [
+    ("POST", "/other", json.dumps({"query": "東京"})),
+    ("POST", "/search", json.dumps({"query": ""})),
+    ("POST", "/search", "{"),
+    ("GET", "/other", None),
+])
+def test_connection_is_reused_after_error(server, method, path, body):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    assert response.status in (400, 404) and "error" in json.loads(response.read())
+    connection.request("GET", "/search?q=%E6%9D%B1%E4%BA%AC")
+    response = connection.getresponse()
+    assert response.status == 200 and json.loads(response.read())["total"] > 0
+    connection.close()
+
+def test_oversized_body_gets_413_and_closes(server, monkeypatch):
+    monkeypatch.setattr("search_server.MAX_BODY_BYTES", 16)
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("POST", "/search", body=json.dumps({"query": "東京" * 100}))
+    response = connection.getresponse()
+    assert response.status == 413 and "error" in json.loads(response.read())
+    assert response.getheader("Connection") == "close"
+    # 閉じた接続は http.client が張り直す
+    connection.request("GET", "/search?q=%E6%9D%B1%E4%BA%AC")
+    response = connection.getresponse()
+    assert response.status == 200
+    connection.close()
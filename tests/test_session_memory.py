@@ -0,0 +1,27 @@
+import sys
+import time
+
+from session_memory import SessionMemory, state_size
+
+class Shared:
+    """共有データを参照するだけのオブジェクト"""
+    def __init__(self):
+        self.data = list(range(100000))
+
+def test_state_size_walks_containers_but_not_shared_objects():
+    shared = Shared()
+    assert state_size(shared) == sys.getsizeof(shared)
+    nested = {"a": ["x" * 100, ("y" * 50,)]}
+    assert state_size(nested) > 150
+    # 同じオブジェクトは1回だけ数える
+    text = "z" * 1000
+    assert state_size([text, text]) == sys.getsizeof([text, text]) + sys.getsizeof(text)
+
+def test_session_memory_expires_idle_sessions():
+    memory = SessionMemory(timeout=60)
+    memory.sessions["first"] = (time.time() - 120, {"a": 28})
+    memory.record("second", {"a": "x" * 1000, "b": 2})
+    rows = memory.snapshot()
+    assert [row["session"] for row in rows] == ["second"]
+    assert rows[0]["largest_key"] == "a"
+    assert memory.summary()["sessions"] == 1
@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from token_cache import COMPACT_FILE, TokenCache, encode_records, get_token_cache, shard_files
+
+TEXTS = ("東京都の待機児童対策について", "防災と地震への備え", "ＡＩを活用した行政サービス")
+
+def tokenize_in_worker(args):
+    cache_dir, text = args
+    cache = TokenCache(cache_dir)
+    cache.tokenize(text)
+    cache.flush()
+    return os.getpid()
+
+def test_compact_merges_shards(tmp_path):
+    cache_dir = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        list(executor.map(tokenize_in_worker, [(cache_dir, text) for text in TEXTS]))
+    assert shard_files(cache_dir)
+
+    cache = TokenCache(cache_dir)
+    expected = {text: cache.tokenize(text) for text in TEXTS}
+    assert cache.misses == 0
+    cache.tokenize("まとめる前に解析した本文")
+    assert cache.compact() >= 1
+    assert shard_files(cache_dir) == []
+    assert os.path.exists(os.path.join(cache_dir, COMPACT_FILE))
+
+    reloaded = TokenCache(cache_dir)
+    assert {text: reloaded.tokenize(text) for text in TEXTS} == expected
+    reloaded.tokenize("まとめる前に解析した本文")
+    assert reloaded.misses == 0
+    # シャードが無ければ何もしない
+    assert reloaded.compact() == 0
+
+def test_truncated_record_is_ignored(tmp_path):
+    cache = TokenCache(str(tmp_path))
+    cache.tokenize(TEXTS[0])
+    cache.tokenize(TEXTS[1])
+    cache.flush()
+    shard, = shard_files(str(tmp_path))
+    with open(shard, "r+b") as f:
+        f.truncate(os.path.getsize(shard) - 3)
+    reloaded = TokenCache(str(tmp_path))
+    reloaded.tokenize(TEXTS[0])
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+
+def test_saved_records_are_looked_up_lazily(tmp_path):
+    cache_dir = str(tmp_path)
+    cache = TokenCache(cache_dir)
+    expected = {text: cache.tokenize(text) for text in TEXTS}
+    cache.flush()
+    # 書き出した結果はメモリから外し、シャードから引く
+    assert cache.records == {} and cache.pending == []
+    assert {text: cache.tokenize(text) for text in TEXTS} == expected
+    assert cache.compact() == 1
+
+    reloaded = TokenCache(cache_dir)
+    assert reloaded.records == {} and reloaded.locations == {}
+    assert len(reloaded.compact_file) == len(TEXTS)
+    assert {text: reloaded.tokenize(text) for text in TEXTS} == expected
+    assert (reloaded.hits, reloaded.misses) == (len(TEXTS), 0)
+
+def test_legacy_compact_file_is_read_and_rewritten(tmp_path):
+    cache = TokenCache(str(tmp_path))
+    expected = {text: cache.tokenize(text) for text in TEXTS}
+    # 旧形式の tokens.bin はシャードと同じ追記形式
+    with open(os.path.join(str(tmp_path), COMPACT_FILE), "wb") as f:
+        f.write(encode_records(cache.records, cache.pending))
+
+    legacy = TokenCache(str(tmp_path))
+    assert legacy.compact_file is None
+    assert {text: legacy.tokenize(text) for text in TEXTS} == expected
+    assert legacy.compact() == 1
+    assert legacy.compact_file is not None and len(legacy.compact_file) == len(TEXTS)
+    assert {text: TokenCache(str(tmp_path)).tokenize(text) for text in TEXTS} == expected
+
+def test_caches_are_separated_by_directory(tmp_path):
+    summary = get_token_cache(str(tmp_path / "summary"))
+    search = get_token_cache(str(tmp_path / "search"))
+    assert summary is not search
+    assert get_token_cache(str(tmp_path / "summary")) is summary
+    summary.tokenize(TEXTS[0])
+    summary.flush()
+    search.tokenize(TEXTS[0])
+    assert search.misses == 1
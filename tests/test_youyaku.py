@@ -0,0 +1,197 @@
+import copy
+import io
+import json
+import random
+
+import pytest
+
+from output_test import youyaku
+from output_test.youyaku import iter_json_array, load_summary_cache
+from token_cache import TokenCache
+
+ELEMENTS = [
+    {"meeting_id": "2021-1", "body": '括弧 ]},[{ と引用符 \\" を含む本文', "items": [1, {"a": None}]},
+    "文字列", 2.5, [], {}, "\\",
+]
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+def test_iter_json_array_matches_json_load(ensure_ascii, chunk_size):
+    text = json.dumps(ELEMENTS, ensure_ascii=ensure_ascii, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+
+@pytest.mark.parametrize("text", ["[1 2]", "[1,", "{}", "[{]", '["a', "[1,]"])
+def test_iter_json_array_rejects_malformed(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text), 2))
+
+def test_iter_json_array_decodes_each_element_once(monkeypatch):
+    calls = []
+    raw_decode = json.JSONDecoder.raw_decode
+    monkeypatch.setattr(json.JSONDecoder, "raw_decode", lambda self, *args: calls.append(1) or raw_decode(self, *args))
+    text = json.dumps([{"body": "あ" * 100_000}, {"body": "い"}])
+    assert len(list(iter_json_array(io.StringIO(text), 64))) == 2
+    assert len(calls) == 2
+
+def write_input(path, bodies):
+    meetings = [{
+        "meeting_id": "2015-1",
+        "categories": [{"category": "福祉", "clusters": [{
+            "cluster_keywords": "保育・待機児童",
+            "items": [{"head": f"項目{i}", "body": body} for i, body in enumerate(bodies)],
+        }]}],
+    }]
+    (path / "outputs").mkdir(exist_ok=True)
+    (path / "outputs" / "2015.json").write_text(json.dumps(meetings, ensure_ascii=False), encoding="utf-8")
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_summary_cache_keeps_only_used_keys(tmp_path, monkeypatch, stream):
+    monkeypatch.chdir(tmp_path)
+    token_cache = TokenCache(str(tmp_path / "tokens"))
+    monkeypatch.setattr(youyaku, "get_token_cache", lambda: token_cache)
+    cache_file = str(tmp_path / "summaries.json")
+    long_body = "。".join(f"保育所の待機児童は{i}人減少した" for i in range(20))
+
+    write_input(tmp_path, [long_body, long_body + "。追加の文"])
+    youyaku.process_files(workers=1, cache_file=cache_file, stream=stream)
+    first = load_summary_cache(cache_file)
+    assert len(first) == 2
+
+    write_input(tmp_path, [long_body])
+    youyaku.process_files(workers=1, cache_file=cache_file, stream=stream)
+    second = load_summary_cache(cache_file)
+    assert second == {key: first[key] for key in second}
+    assert len(second) == 1
+    saved = json.loads((tmp_path / "output_test" / "2015.json").read_text(encoding="utf-8"))
+    assert saved[0]["categories"][0]["clusters"][0]["items"][0]["body"] in second.values()
+
+# 要約の元にする語（janomeで名詞・動詞になるものと句読点）
+SUMMARY_WORDS = ("保育所", "待機児童", "対策", "東京都", "推進", "する", "防災", "地震", "子ども", "支援", "の", "を", "、")
+
+def make_sentence(rng):
+    return "".join(rng.choices(SUMMARY_WORDS, k=rng.randint(2, 14)))
+
+def make_year(rng, shared_body):
+    """要約対象の長い本文・短い本文・同じ文の繰り返し（同点）・他の年度と同じ本文を含む会議データ"""
+    meetings = []
+    for meeting_no in range(2):
+        clusters = []
+        for keywords in ("保育・待機児童", "防災・地震"):
+            bodies = ["。".join(make_sentence(rng) for _ in range(rng.randint(3, 20))) + "。" for _ in range(3)]
+            bodies += ["短い本文。", "同じ文です。" * 40, shared_body, "。．.", "  待機児童 対策．．推進する. "]
+            clusters.append({"cluster_keywords": keywords, "items": [{"head": "見出し", "body": body} for body in bodies]})
+        meetings.append({"meeting_id": f"x-{meeting_no}", "categories": [{"category": "福祉", "clusters": clusters}]})
+    return meetings
+
+def reference_extract_keywords(tokenizer, text, cluster_keywords_str="", n=5):
+    words = []
+    for token in tokenizer.tokenize(text):
+        pos = token.part_of_speech.split(',')[0]
+        if pos in ['名詞', '動詞', '形容詞'] and token.surface not in ['。', '、']:
+            words.append(token.surface)
+    word_counts = {}
+    for word in words:
+        if len(word) > 1:
+            word_counts[word] = word_counts.get(word, 0) + 1
+    if cluster_keywords_str:
+        for kw in cluster_keywords_str.split('・'):
+            if kw in word_counts:
+                word_counts[kw] += 3
+    return sorted(word_counts.items(), key=lambda x: -x[1])[:n]
+
+def reference_scores(sentences, keywords):
+    """元の summarize_content の1文ずつの重要度計算"""
+    scores = []
+    for i, sentence in enumerate(sentences):
+        score = 0
+        score += sum(5 for kw in keywords if kw in sentence)
+        score *= 1.5 if i == 0 or i == len(sentences) - 1 else 1
+        score *= min(1, len(sentence) / 30)
+        scores.append(score)
+    return scores
+
+def reference_summarize_content(tokenizer, text, cluster_keywords="", target_length=150):
+    """元のスクリプトの要約（1文ずつ採点して安定ソートで選ぶ）"""
+    if not text or len(text) <= target_length:
+        return text
+    sentences = [s.strip() for s in text.split('。') if s.strip()]
+    if not sentences:
+        return ""
+    keywords = [kw[0] for kw in reference_extract_keywords(tokenizer, text, cluster_keywords)]
+    scored_sentences = [
+        (score, sentence, i) for i, (score, sentence) in enumerate(zip(reference_scores(sentences, keywords), sentences))
+    ]
+    scored_sentences.sort(reverse=True, key=lambda x: x[0])
+    selected_indices = set()
+    current_length = 0
+    for score, sentence, orig_idx in scored_sentences:
+        if current_length + len(sentence) <= target_length:
+            selected_indices.add(orig_idx)
+            current_length += len(sentence)
+    summary_sentences = []
+    for idx, sentence in enumerate(sentences):
+        if idx in selected_indices:
+            summary_sentences.append(sentence)
+            if len('。'.join(summary_sentences)) >= target_length:
+                break
+    result = '。'.join(summary_sentences)
+    if not result.endswith('。'):
+        result += '。'
+    return result[:target_length]
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    from janome.tokenizer import Tokenizer
+    return Tokenizer()
+
+@pytest.fixture(scope="module")
+def years():
+    rng = random.Random(0)
+    shared_body = "。".join(make_sentence(rng) for _ in range(12))
+    return {year: make_year(rng, shared_body) for year in (2015, 2016, 2018)}
+
+@pytest.mark.parametrize("stream, workers", [(False, 1), (False, 2), (True, 1), (True, 2)])
+def test_output_matches_baseline_script(tmp_path, monkeypatch, tokenizer, years, stream, workers):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(youyaku, "get_token_cache", lambda cache=TokenCache(str(tmp_path / "tokens")): cache)
+    (tmp_path / "outputs").mkdir()
+    for year, data in years.items():
+        (tmp_path / "outputs" / f"{year}.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    youyaku.process_files(workers=workers, cache_file=None, stream=stream)
+
+    for year, data in years.items():
+        expected = copy.deepcopy(data)
+        for meeting in expected:
+            for category in meeting["categories"]:
+                for cluster in category["clusters"]:
+                    for item in cluster["items"]:
+                        item["body"] = reference_summarize_content(
+                            tokenizer, youyaku.preprocess_text(item["body"]), cluster["cluster_keywords"]
+                        )
+        # 元のスクリプトと同じ json.dump の書式でバイト単位まで一致する
+        expected_text = json.dumps(expected, ensure_ascii=False, indent=2, separators=(',', ': '))
+        assert (tmp_path / "output_test" / f"{year}.json").read_text(encoding="utf-8") == expected_text
+    assert not (tmp_path / "output_test" / "2017.json").exists()
+
+def test_batched_scores_match_per_sentence_loop(tmp_path, monkeypatch, tokenizer, years):
+    monkeypatch.setattr(youyaku, "get_token_cache", lambda cache=TokenCache(str(tmp_path)): cache)
+    clusters = [
+        cluster for data in years.values() for meeting in data
+        for category in meeting["categories"] for cluster in category["clusters"]
+    ]
+    for cluster in clusters:
+        texts = [youyaku.preprocess_text(item["body"]) for item in cluster["items"]]
+        sentence_lists = [youyaku.split_sentences(text) for text in texts]
+        keyword_lists = [
+            [kw[0] for kw in reference_extract_keywords(tokenizer, text, cluster["cluster_keywords"])] for text in texts
+        ]
+        # 同じ文の繰り返しで同点を含む。スコアは浮動小数点の値まで一致する
+        scores = youyaku.score_sentences(sentence_lists, keyword_lists)
+        assert [list(item_scores) for item_scores in scores] == [
+            reference_scores(sentences, keywords) for sentences, keywords in zip(sentence_lists, keyword_lists)
+        ]
+        assert youyaku.summarize_cluster(texts, cluster["cluster_keywords"]) == [
+            reference_summarize_content(tokenizer, text, cluster["cluster_keywords"]) for text in texts
+        ]
+    assert youyaku.score_sentences([[], []], [[], []])[0].size == 0
@@ -0,0 +1,354 @@
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+# 形態素解析結果の保存先（プロセスごとに tokens-<pid>.bin に追記し、compact() で tokens.bin にまとめる）
+TOKEN_CACHE_DIR = "cache/tokens"
+# 検索（関連度順の語統計）用。要約が解析する要約前の長い本文を検索側のプロセスが読み込まないよう分ける
+SEARCH_TOKEN_CACHE_DIR = "cache/search_tokens"
+COMPACT_FILE = "tokens.bin"
+
+# 品詞の大分類（IPADIC）。一覧に無いものは「その他」として保存する
+POS_HEADS = (
+    "名詞", "動詞", "形容詞", "副詞", "助詞", "助動詞", "記号",
+    "接頭詞", "連体詞", "接続詞", "感動詞", "フィラー", "その他",
+)
+POS_IDS = {pos: i for i, pos in enumerate(POS_HEADS)}
+
+# レコード: 本文ハッシュ(16) + トークン数(uint32)、続いて開始位置(uint32)・長さ(uint16)・品詞(uint8)の各列
+RECORD_HEADER = struct.Struct("<16sI")
+
+# まとめたファイル: 見出し(識別子・件数)、ハッシュの昇順表(16×件数)、レコードの位置(uint64×件数)、レコード
+COMPACT_HEADER = struct.Struct("<8sI")
+COMPACT_MAGIC = b"TKNCACHE"
+OFFSET = struct.Struct("<Q")
+
+Token = namedtuple("Token", ["surface", "pos", "start"])
+
+def text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+def scan_records(buffer, position=0):
+    """追記形式のレコードを (ハッシュ, 開始位置, 終わり) で順に返す（途中で切れたレコードの手前まで）"""
+    while position + RECORD_HEADER.size <= len(buffer):
+        digest, count = RECORD_HEADER.unpack_from(buffer, position)
+        end = position + RECORD_HEADER.size + count * 7
+        if end > len(buffer):
+            break
+        yield digest, position, end
+        position = end
+
+def decode_record(buffer, position):
+    """position から始まるレコードを (開始位置, 長さ, 品詞ID) の列にする"""
+    _, count = RECORD_HEADER.unpack_from(buffer, position)
+    position += RECORD_HEADER.size
+    starts = array("I", buffer[position:position + count * 4])
+    position += count * 4
+    lengths = array("H", buffer[position:position + count * 2])
+    position += count * 2
+    return starts, lengths, bytes(buffer[position:position + count])
+
+def read_record(path, position):
+    """シャードの position にあるレコードを読む（消えたシャードや切れたレコードなら None）"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(position)
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return None
+            data = header + f.read(RECORD_HEADER.unpack(header)[1] * 7)
+    except OSError:
+        return None
+    if next(scan_records(data), None) is None:
+        return None
+    return decode_record(data, 0)
+
+def map_file(path):
+    """ファイルを読み取り専用でメモリマップする（空なら空のバイト列）"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class CompactFile:
+    """compact() が書き出した tokens.bin をメモリマップし、ハッシュの二分探索でレコードを引く
+
+    レコードは引かれたときだけ復元するため、ファイル全体を辞書に読み込まない。
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < COMPACT_HEADER.size or buffer[:len(COMPACT_MAGIC)] != COMPACT_MAGIC:
+            raise ValueError("まとめた形態素解析キャッシュではありません")
+        self.buffer = buffer
+        self.count = COMPACT_HEADER.unpack_from(buffer)[1]
+        self.offsets_at = COMPACT_HEADER.size + 16 * self.count
+        if self.offsets_at + OFFSET.size * self.count > len(buffer):
+            raise ValueError("形態素解析キャッシュが途中で切れています")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        # bisect 用に、index 番目のハッシュを返す
+        start = COMPACT_HEADER.size + 16 * index
+        return self.buffer[start:start + 16]
+
+    def position(self, index):
+        return OFFSET.unpack_from(self.buffer, self.offsets_at + OFFSET.size * index)[0]
+
+    def find(self, digest):
+        index = bisect_left(self, digest)
+        if index < self.count and self[index] == digest:
+            return decode_record(self.buffer, self.position(index))
+        return None
+
+    def spans(self):
+        """レコードを (ハッシュ, 開始位置, 終わり) で返す（compact() でまとめ直すときに使う）"""
+        return scan_records(self.buffer, self.offsets_at + OFFSET.size * self.count)
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+def open_compact(path):
+    """tokens.bin を開く（無ければ None、旧形式の追記ファイルなら ValueError）"""
+    try:
+        buffer = map_file(path)
+    except FileNotFoundError:
+        return None
+    try:
+        return CompactFile(buffer)
+    except ValueError:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+        raise
+
+def encode_records(records, digests):
+    """レコードを保存用のバイト列にする"""
+    chunks = []
+    for digest in digests:
+        starts, lengths, pos_ids = records[digest]
+        chunks.append(RECORD_HEADER.pack(digest, len(starts)))
+        chunks.append(starts.tobytes())
+        chunks.append(lengths.tobytes())
+        chunks.append(pos_ids)
+    return b"".join(chunks)
+
+def shard_files(cache_dir):
+    """プロセスごとの追記ファイル（まだ tokens.bin にまとめていないもの）"""
+    return sorted(glob.glob(os.path.join(cache_dir, "tokens-*.bin")))
+
+class TokenCache:
+    """janomeの形態素解析結果を本文のハッシュ単位で保存・再利用するキャッシュ
+
+    保存するのは位置・長さ・品詞IDだけで、表層形は呼び出し側が渡す本文から
+    切り出す。同じ本文は実行回やプロセスをまたいで一度しか解析しない。
+    保存済みの結果はメモリに読み込まず、まとめたファイル（tokens.bin）は
+    メモリマップして二分探索で、シャードは位置だけ覚えておいて引かれたときに読む。
+    メモリに持つのはこのプロセスで解析してまだ書き出していない結果だけ。
+    アプリではウォームアップのスレッドと検索が同時に使うため、未解析の本文の
+    解析と保存はロックの下で行う。
+    """
+
+    def __init__(self, cache_dir=TOKEN_CACHE_DIR):
+        self.cache_dir = cache_dir
+        # まだシャードに書き出していない解析結果
+        self.records = {}
+        self.pending = []
+        self.compact_file = None
+        # シャードにあるレコードの位置 {ハッシュ: (パス, 位置)}
+        self.locations = {}
+        self.tokenizer = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """まとめたファイルを開き、まだまとめていないシャードのレコードの位置を集める"""
+        compact_path = os.path.join(self.cache_dir, COMPACT_FILE)
+        shards = shard_files(self.cache_dir)
+        try:
+            self.compact_file = open_compact(compact_path)
+        except ValueError:
+            # 旧形式（追記形式のまま）の tokens.bin はシャードと同じに扱い、次の compact() で直す
+            shards.insert(0, compact_path)
+        for path in shards:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # 別のプロセスが compact() で消した直後なら、中身は tokens.bin に入っている
+                continue
+            for digest, position, _ in scan_records(data):
+                self.locations.setdefault(digest, (path, position))
+
+    def lookup(self, digest):
+        """保存済みの解析結果を引く（無ければ None）"""
+        record = self.records.get(digest)
+        if record is None and self.compact_file is not None:
+            record = self.compact_file.find(digest)
+        if record is None:
+            location = self.locations.get(digest)
+            if location is not None:
+                record = read_record(*location)
+        return record
+
+    def tokenize(self, text, store=True):
+        """本文をトークン（表層形, 品詞の大分類, 開始位置）の列にする
+
+        store=False のときは未解析でも結果を保存しない（検索クエリのように
+        種類が限りなく増える短い文字列で、キャッシュが際限なく育たないようにする）。
+        """
+        digest = text_digest(text)
+        record = self.lookup(digest)
+        if record is None and not store:
+            with self.lock:
+                self.misses += 1
+                record = self.analyze(text)
+        elif record is None:
+            with self.lock:
+                record = self.lookup(digest)
+                if record is None:
+                    self.misses += 1
+                    record = self.analyze(text)
+                    self.records[digest] = record
+                    self.pending.append(digest)
+                else:
+                    self.hits += 1
+        else:
+            self.hits += 1
+
+        starts, lengths, pos_ids = record
+        return [
+            Token(text[start:start + length], POS_HEADS[pos_id], start)
+            for start, length, pos_id in zip(starts, lengths, pos_ids)
+        ]
+
+    def analyze(self, text):
+        """janomeで解析し、保存用の列形式にする"""
+        if self.tokenizer is None:
+            # 全件キャッシュ済みなら辞書を読み込まずに済むよう、必要になってから読み込む
+            from janome.tokenizer import Tokenizer
+            self.tokenizer = Tokenizer()
+
+        starts = array("I")
+        lengths = array("H")
+        pos_ids = bytearray()
+        position = 0
+        for token in self.tokenizer.tokenize(text):
+            start = text.find(token.surface, position)
+            if start < 0:
+                start = position
+            starts.append(start)
+            lengths.append(len(token.surface))
+            pos_ids.append(POS_IDS.get(token.part_of_speech.split(',')[0], POS_IDS["その他"]))
+            position = start + len(token.surface)
+        return starts, lengths, bytes(pos_ids)
+
+    def flush(self):
+        """まだ保存していない解析結果を自プロセスのシャードに追記し、メモリから外す"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+            if not pending:
+                return
+            data = encode_records(self.records, pending)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"tokens-{os.getpid()}.bin")
+            with open(path, "ab") as f:
+                base = f.tell()
+                f.write(data)
+            # 以後はシャードから読む（位置を先に登録し、引けない瞬間を作らない）
+            for digest, position, _ in scan_records(data):
+                self.locations[digest] = (path, base + position)
+            for digest in pending:
+                del self.records[digest]
+
+    def compact(self):
+        """シャードを tokens.bin にまとめて消す（シャードの数と起動時の読み込みが増え続けないように）
+
+        要約や索引の構築を終えた親プロセスなど、同じディレクトリに追記中の
+        プロセスが無いときに呼ぶ。追記と重なって失われるのはキャッシュの一部だけで、
+        その本文は次回に解析し直される。まとめ直しもレコードを復元せず、
+        メモリマップしたファイルからバイト列のまま写す。
+        """
+        self.flush()
+        shards = shard_files(self.cache_dir)
+        compact_path = os.path.join(self.cache_dir, COMPACT_FILE)
+        buffers = []
+        spans = {}
+        try:
+            try:
+                compact_file = open_compact(compact_path)
+            except ValueError:
+                shards.insert(0, compact_path)
+                compact_file = None
+            if not shards:
+                if compact_file is not None:
+                    compact_file.close()
+                return 0
+            if compact_file is not None:
+                buffers.append(compact_file.buffer)
+                for digest, start, end in compact_file.spans():
+                    spans[digest] = (compact_file.buffer, start, end)
+            for path in shards:
+                try:
+                    buffer = map_file(path)
+                except FileNotFoundError:
+                    continue
+                buffers.append(buffer)
+                for digest, start, end in scan_records(buffer):
+                    spans.setdefault(digest, (buffer, start, end))
+
+            digests = sorted(spans)
+            offsets = array("Q")
+            position = COMPACT_HEADER.size + (16 + OFFSET.size) * len(digests)
+            for digest in digests:
+                _, start, end = spans[digest]
+                offsets.append(position)
+                position += end - start
+            temp_path = f"{compact_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(COMPACT_HEADER.pack(COMPACT_MAGIC, len(digests)))
+                f.write(b"".join(digests))
+                f.write(offsets.tobytes())
+                for digest in digests:
+                    buffer, start, end = spans[digest]
+                    f.write(buffer[start:end])
+        finally:
+            for buffer in buffers:
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+
+        with self.lock:
+            # Windowsでは開いているファイルを置き換えられないため、先に閉じる
+            if self.compact_file is not None:
+                self.compact_file.close()
+            os.replace(temp_path, compact_path)
+            self.compact_file = open_compact(compact_path)
+            self.locations = {}
+        for path in shards:
+            if path == compact_path:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                # Windowsで他のプロセスが開いているなど。次回まとめ直す（重複は読み込み時に畳まれる）
+                pass
+        return len(shards)
+
+_token_caches = {}
+_token_cache_lock = threading.Lock()
+
+def get_token_cache(cache_dir=TOKEN_CACHE_DIR):
+    """プロセス内で共有するTokenCacheを保存先ごとに返す（要約は既定、検索は SEARCH_TOKEN_CACHE_DIR）"""
+    with _token_cache_lock:
+        if cache_dir not in _token_caches:
+            _token_caches[cache_dir] = TokenCache(cache_dir)
+        return _token_caches[cache_dir]